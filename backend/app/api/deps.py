@@ -0,0 +1,28 @@
+"""
+Shared FastAPI dependencies for API routers.
+"""
+from fastapi import Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.session import get_db
+from app.services.recommendation_engine import RecommendationEngine
+
+
+def get_recommendation_engine(
+    db: AsyncSession = Depends(get_db),
+) -> RecommendationEngine:
+    """
+    Dependency to get a recommendation engine bound to the request's session.
+
+    FastAPI caches the result per request, so every dependant in the same
+    request shares one engine. The engine itself only holds the session;
+    process-wide resources (LLM client) are module-level singletons, so a
+    shared engine instance with a rebound session would race between
+    concurrent requests without saving any setup.
+
+    Usage in FastAPI endpoint:
+        @router.post("/explain")
+        async def explain(engine: RecommendationEngine = Depends(get_recommendation_engine)):
+            ...
+    """
+    return RecommendationEngine(db)
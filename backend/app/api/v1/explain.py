@@ -4,28 +4,28 @@ Explanation API endpoint.
 Endpoint:
 - POST /explain - Get detailed explanation for a specific headphone match
 """
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
+from fastapi import APIRouter, Depends
+from fastapi.responses import ORJSONResponse
 import structlog
 
 from app.config import settings
-from app.core.exceptions import ValidationException, LLMException
-from app.db.session import get_db
+from app.core.cache import cache
+from app.api.deps import get_recommendation_engine
 from app.schemas.recommendation import ExplainRequest, ExplainResponse
 from app.services.recommendation_engine import RecommendationEngine
 
 logger = structlog.get_logger()
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 
-@router.post("/explain", response_model=ExplainResponse)
-@limiter.limit(f"{settings.rate_limit_explain}/minute")
+@router.post(
+    "/explain",
+    response_model=ExplainResponse,
+    response_class=ORJSONResponse,
+)
 async def explain_recommendation(
     request: ExplainRequest,
-    db: AsyncSession = Depends(get_db),
+    engine: RecommendationEngine = Depends(get_recommendation_engine),
 ):
     """
     Generate detailed explanation for a specific headphone recommendation.
@@ -43,52 +43,34 @@ async def explain_recommendation(
     - detailed_explanation: 4-5 sentence detailed explanation
     - comparison_points: List of comparison points vs alternatives
 
+    **Errors:**
+    - 404 if the session or headphone match does not exist
+    - 503 if the LLM service is unavailable
+
+    **Caching:**
+    - Explanations are cached for 24 hours per session and headphone
+
     **Rate Limit:** {settings.rate_limit_explain} requests/minute per IP
     """
-    try:
-        engine = RecommendationEngine(db)
-
-        # Generate detailed explanation using LLM
-        explanation = await engine.generate_detailed_explanation(
-            session_id=request.session_id,
-            headphone_id=request.headphone_id,
-        )
+    session_id = str(request.session_id)
+    headphone_id = str(request.headphone_id)
 
-        return ExplainResponse(
-            detailed_explanation=explanation.get("detailed_explanation", ""),
-            comparison_points=explanation.get("comparison_points", []),
-        )
+    # A hit skips the database lookups as well as the LLM call
+    cached = await cache.get_cached_explanation(session_id, headphone_id)
+    if cached:
+        logger.info("explanation_cache_hit", session_id=session_id, headphone_id=headphone_id)
+        return ExplainResponse(**cached)
 
-    except ValidationException as e:
-        logger.error(
-            "explain_validation_error",
-            error=str(e),
-            session_id=str(request.session_id),
-            headphone_id=str(request.headphone_id),
-        )
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e),
-        )
+    # Generate detailed explanation using LLM
+    explanation = await engine.generate_detailed_explanation(
+        session_id=request.session_id,
+        headphone_id=request.headphone_id,
+    )
 
-    except LLMException as e:
-        logger.error(
-            "explain_llm_error",
-            error=str(e),
-            session_id=str(request.session_id),
-        )
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Explanation service temporarily unavailable",
-        )
+    response = ExplainResponse(
+        detailed_explanation=explanation.get("detailed_explanation", ""),
+        comparison_points=explanation.get("comparison_points", []),
+    )
+    await cache.cache_explanation(session_id, headphone_id, response.model_dump())
 
-    except Exception as e:
-        logger.error(
-            "explain_error",
-            error=str(e),
-            session_id=str(request.session_id),
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to generate explanation",
-        )
+    return response
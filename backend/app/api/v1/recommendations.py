@@ -7,18 +7,19 @@ Endpoints:
 """
 import uuid
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Request, Response, status
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from slowapi import Limiter
-from slowapi.util import get_remote_address
 import structlog
 
 from app.config import settings
 from app.core.cache import cache
-from app.core.exceptions import ValidationException, LLMException
+from app.core.exceptions import ResourceNotFoundException
+from app.api.deps import get_recommendation_engine
 from app.db.session import get_db
-from app.models import UserPreference, SessionStatus
+from app.models import Headphone, HeadphoneMatch, UserPreference, SessionStatus, SCORE_SCALE
 from app.schemas.recommendation import (
+    MatchScores,
     RecommendationRequest,
     RecommendationResponse,
     RecommendationSessionResponse,
@@ -29,14 +30,143 @@ from app.services.recommendation_engine import RecommendationEngine
 
 logger = structlog.get_logger()
 router = APIRouter()
-limiter = Limiter(key_func=get_remote_address)
 
+_HEADPHONE_FIELDS = tuple(HeadphoneResponse.model_fields)
+
+# Complete sessions are immutable once processing finishes
+SESSION_CACHE_CONTROL = "private, max-age=3600, immutable"
+
+
+# ============================================
+# Response assembly
+# ============================================
+# Matches and headphones are loaded from our own database, so responses are
+# built with model_construct() and skip Pydantic validation.
+
+def _scores(match: HeadphoneMatch) -> MatchScores:
+    """Build match scores from a HeadphoneMatch row."""
+    return MatchScores.model_construct(
+        overall=match.overall_score / SCORE_SCALE,
+        genre_match=match.genre_match_score / SCORE_SCALE,
+        sound_profile=match.sound_profile_score / SCORE_SCALE,
+        use_case=match.use_case_score / SCORE_SCALE,
+        budget=match.budget_score / SCORE_SCALE,
+        feature_match=match.feature_match_score / SCORE_SCALE,
+    )
+
+
+def _headphone_response(headphone: Headphone) -> HeadphoneResponse:
+    """Build a headphone response from a Headphone row."""
+    return HeadphoneResponse.model_construct(
+        **{field: getattr(headphone, field) for field in _HEADPHONE_FIELDS}
+    )
+
+
+def _matches_to_response(matches: list[HeadphoneMatch]) -> list[HeadphoneMatchResponse]:
+    """Build match responses for a session's matches."""
+    return [
+        HeadphoneMatchResponse.model_construct(
+            id=match.id,
+            rank=match.rank,
+            scores=_scores(match),
+            explanation=match.explanation,
+            personalized_pros=match.personalized_pros,
+            personalized_cons=match.personalized_cons,
+            match_highlights=match.match_highlights,
+            headphone=_headphone_response(match.headphone),
+        )
+        for match in matches
+    ]
+
+
+def _json_response(model: RecommendationResponse, headers: dict | None = None) -> Response:
+    """
+    Serialize a session response straight to JSON bytes.
+
+    Returning a Response skips FastAPI's response_model round-trip (dump to
+    dicts, re-validate, dump again); pydantic-core writes the JSON in one
+    pass, with the same aliases the response model would use.
+    """
+    return Response(
+        content=model.model_dump_json(by_alias=True),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+def _session_etag(response: RecommendationResponse) -> str:
+    """Build a weak ETag for a complete session response."""
+    return f'W/"{response.session_id}-{response.processing_time_ms}"'
+
+
+async def _load_session_response(
+    session_id: uuid.UUID,
+    engine: RecommendationEngine,
+) -> RecommendationResponse | None:
+    """
+    Load a session from the database and build its response.
+
+    Complete sessions are written back to the cache.
+
+    Returns:
+        Session response, or None if the session does not exist
+    """
+    session = await engine.get_session_with_matches(session_id)
+
+    if not session:
+        return None
+
+    # Build response
+    response = RecommendationResponse(
+        session_id=session.id,
+        status=session.status,
+        processing_time_ms=session.processing_time_ms,
+    )
+
+    # Include recommendations if complete
+    if session.status == SessionStatus.COMPLETE and session.matches:
+        response.recommendations = _matches_to_response(session.matches)
+
+        # Cache complete sessions
+        cache.cache_session_background(
+            str(session.id),
+            response.model_dump_json(),
+        )
+
+    return response
 
-@router.post("/recommend", response_model=RecommendationResponse)
-@limiter.limit(f"{settings.rate_limit_recommend}/minute")
+
+async def _get_session_response(
+    session_id: uuid.UUID,
+    engine: RecommendationEngine,
+) -> RecommendationResponse | None:
+    """
+    Get a session response from the cache, falling back to the database.
+
+    Returns:
+        Session response, or None if the session does not exist
+    """
+    cached = await cache.get_cached_session(str(session_id))
+    if cached:
+        logger.info("session_cache_hit", session_id=str(session_id))
+        return RecommendationResponse(**cached)
+
+    # Fetch from database; concurrent misses for the same session share one load
+    return await cache.single_flight(
+        f"session:{session_id}",
+        lambda: _load_session_response(session_id, engine),
+    )
+
+
+@router.post(
+    "/recommend",
+    response_model=RecommendationResponse,
+    response_class=ORJSONResponse,
+)
 async def generate_recommendations(
     request: RecommendationRequest,
     db: AsyncSession = Depends(get_db),
+    engine: RecommendationEngine = Depends(get_recommendation_engine),
 ):
     """
     Generate headphone recommendations based on user preferences.
@@ -49,131 +179,81 @@ async def generate_recommendations(
 
     **Request Body:**
     - preferences: Complete user preference object
-    - async: If true, process in background (TODO: Celery integration)
+    - async: Accepted but ignored; requests are always processed synchronously
 
     **Response:**
     - session_id: Unique session identifier
     - status: Session status (complete or processing)
     - recommendations: List of recommended headphones (if sync mode)
 
-    **Rate Limit:** {settings.rate_limit_recommend} requests/minute per IP
-    """
-    try:
-        # Create user preference
-        session_id = request.preferences.session_id or str(uuid.uuid4())
-
-        preference = UserPreference(
-            session_id=session_id,
-            genres=request.preferences.genres,
-            favorite_artists=request.preferences.favorite_artists,
-            favorite_tracks=[t.model_dump() for t in request.preferences.favorite_tracks],
-            hours_per_day=request.preferences.hours_per_day,
-            primary_source=request.preferences.primary_source,
-            listening_environment=request.preferences.listening_environment,
-            sound_preferences=request.preferences.sound_preferences.model_dump(),
-            primary_use_case=request.preferences.primary_use_case,
-            secondary_use_cases=request.preferences.secondary_use_cases,
-            budget_min=request.preferences.budget_min,
-            budget_max=request.preferences.budget_max,
-            preferred_type=request.preferences.preferred_type,
-            open_back_acceptable=request.preferences.open_back_acceptable,
-            wireless_required=request.preferences.wireless_required,
-            anc_required=request.preferences.anc_required,
-            additional_notes=request.preferences.additional_notes,
-        )
-
-        db.add(preference)
-        await db.flush()
-
-        logger.info(
-            "preference_created",
-            preference_id=str(preference.id),
-            session_id=session_id,
-            genres=preference.genres,
-            budget=f"${preference.budget_min}-${preference.budget_max}",
-        )
-
-        # TODO: If async mode, trigger Celery task and return immediately
-        if request.async_mode:
-            # For now, we'll process synchronously
-            # In Phase 6, this will trigger a Celery task
-            logger.warning("async_mode_not_implemented", session_id=session_id)
-
-        # Generate recommendations (synchronous)
-        engine = RecommendationEngine(db)
-        session = await engine.generate_recommendations(preference, top_n=5)
-
-        # Build response
-        response = RecommendationResponse(
-            session_id=session.id,
-            status=session.status,
-            processing_time_ms=session.processing_time_ms,
-        )
+    **Caching:**
+    - Identical preferences within 10 minutes reuse the earlier LLM ranking
+      (sound preferences are compared to one decimal); the response is
+      still a new session under the request's own session_id
 
-        # If complete, include recommendations
-        if session.status == SessionStatus.COMPLETE:
-            # Fetch full session with matches
-            full_session = await engine.get_session_with_matches(session.id)
-
-            if full_session and full_session.matches:
-                recommendations = []
-                for match in full_session.matches:
-                    match_response = HeadphoneMatchResponse(
-                        id=match.id,
-                        rank=match.rank,
-                        scores={
-                            "overall": float(match.overall_score),
-                            "genreMatch": float(match.genre_match_score),
-                            "soundProfile": float(match.sound_profile_score),
-                            "useCase": float(match.use_case_score),
-                            "budget": float(match.budget_score),
-                            "featureMatch": float(match.feature_match_score),
-                        },
-                        explanation=match.explanation,
-                        personalizedPros=match.personalized_pros,
-                        personalizedCons=match.personalized_cons,
-                        matchHighlights=match.match_highlights,
-                        headphone=HeadphoneResponse.model_validate(match.headphone),
-                    )
-                    recommendations.append(match_response)
-
-                response.recommendations = recommendations
-
-        # Cache successful result
-        if session.status == SessionStatus.COMPLETE:
-            await cache.cache_session(
-                str(session.id),
-                response.model_dump(mode="json"),
-            )
-
-        return response
-
-    except ValidationException as e:
-        logger.error("validation_error", error=str(e))
-        raise HTTPException(
-            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
-            detail=str(e),
-        )
+    **Errors:**
+    - 422 if no headphones match the preferences
+    - 503 if the LLM service is unavailable
 
-    except LLMException as e:
-        logger.error("llm_error", error=str(e))
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Recommendation service temporarily unavailable",
+    **Rate Limit:** {settings.rate_limit_recommend} requests/minute per IP
+    """
+    # Single walk over the validated model; nested tracks/sound preferences
+    # come out as plain dicts ready for the JSON columns
+    preferences = request.preferences.model_dump(exclude={"session_id"})
+
+    # Create user preference
+    session_id = request.preferences.session_id or str(uuid.uuid4())
+
+    preference = UserPreference(session_id=session_id, **preferences)
+
+    db.add(preference)
+    await db.flush()
+
+    logger.info(
+        "preference_created",
+        preference_id=str(preference.id),
+        session_id=session_id,
+        genres=preference.genres,
+        budget=f"${preference.budget_min:.2f}-${preference.budget_max:.2f}",
+    )
+
+    # Generate recommendations (synchronous; async_mode is accepted but ignored)
+    session = await engine.generate_recommendations(preference, top_n=5)
+
+    # Build response
+    response = RecommendationResponse(
+        session_id=session.id,
+        status=session.status,
+        processing_time_ms=session.processing_time_ms,
+    )
+
+    # If complete, include recommendations
+    if session.status == SessionStatus.COMPLETE:
+        # Fetch full session with matches
+        full_session = await engine.get_session_with_matches(session.id)
+
+        if full_session and full_session.matches:
+            response.recommendations = _matches_to_response(full_session.matches)
+
+    # Cache successful result
+    if session.status == SessionStatus.COMPLETE:
+        cache.cache_session_background(
+            str(session.id),
+            response.model_dump_json(),
         )
 
-    except Exception as e:
-        logger.error("recommendation_error", error=str(e))
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to generate recommendations",
-        )
+    return _json_response(response)
 
 
-@router.get("/recommendations/{session_id}", response_model=RecommendationResponse)
+@router.get(
+    "/recommendations/{session_id}",
+    response_model=RecommendationResponse,
+    response_class=ORJSONResponse,
+)
 async def get_recommendation_session(
     session_id: uuid.UUID,
-    db: AsyncSession = Depends(get_db),
+    request: Request,
+    engine: RecommendationEngine = Depends(get_recommendation_engine),
 ):
     """
     Retrieve a recommendation session by ID.
@@ -187,70 +267,20 @@ async def get_recommendation_session(
     **Caching:**
     - Complete sessions are cached for 1 hour
     - Processing sessions are not cached
+    - Complete sessions carry an ETag; a matching If-None-Match returns 304
     """
-    try:
-        # Check cache first
-        cached = await cache.get_cached_session(str(session_id))
-        if cached:
-            logger.info("session_cache_hit", session_id=str(session_id))
-            return RecommendationResponse(**cached)
-
-        # Fetch from database
-        engine = RecommendationEngine(db)
-        session = await engine.get_session_with_matches(session_id)
-
-        if not session:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Session not found",
-            )
-
-        # Build response
-        response = RecommendationResponse(
-            session_id=session.id,
-            status=session.status,
-            processing_time_ms=session.processing_time_ms,
-        )
+    session_response = await _get_session_response(session_id, engine)
 
-        # Include recommendations if complete
-        if session.status == SessionStatus.COMPLETE and session.matches:
-            recommendations = []
-            for match in session.matches:
-                match_response = HeadphoneMatchResponse(
-                    id=match.id,
-                    rank=match.rank,
-                    scores={
-                        "overall": float(match.overall_score),
-                        "genreMatch": float(match.genre_match_score),
-                        "soundProfile": float(match.sound_profile_score),
-                        "useCase": float(match.use_case_score),
-                        "budget": float(match.budget_score),
-                        "featureMatch": float(match.feature_match_score),
-                    },
-                    explanation=match.explanation,
-                    personalizedPros=match.personalized_pros,
-                    personalizedCons=match.personalized_cons,
-                    matchHighlights=match.match_highlights,
-                    headphone=HeadphoneResponse.model_validate(match.headphone),
-                )
-                recommendations.append(match_response)
-
-            response.recommendations = recommendations
-
-            # Cache complete sessions
-            await cache.cache_session(
-                str(session.id),
-                response.model_dump(mode="json"),
-            )
-
-        return response
-
-    except HTTPException:
-        raise
-
-    except Exception as e:
-        logger.error("session_retrieval_error", error=str(e), session_id=str(session_id))
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to retrieve session",
-        )
+    if session_response is None:
+        raise ResourceNotFoundException("Session")
+
+    # Complete sessions never change, so they can be revalidated by ETag
+    headers = None
+    if session_response.status == SessionStatus.COMPLETE:
+        etag = _session_etag(session_response)
+        headers = {"ETag": etag, "Cache-Control": SESSION_CACHE_CONTROL}
+
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return _json_response(session_response, headers)
@@ -2,6 +2,8 @@
 Application configuration using Pydantic Settings.
 Environment variables are loaded from .env file.
 """
+from functools import cached_property, lru_cache
+from pathlib import Path
 from typing import Any, List
 from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
@@ -22,25 +24,61 @@ class Settings(BaseSettings):
     debug: bool = Field(default=False, description="Debug mode")
     secret_key: str = Field(..., description="Secret key for JWT")
     api_v1_prefix: str = Field(default="/api/v1", description="API v1 prefix")
+    data_dir: Path = Field(
+        default=Path(__file__).resolve().parents[1] / "seeds",
+        description="Directory holding catalog data files",
+    )
 
     # Server
     host: str = Field(default="0.0.0.0", description="Server host")
     port: int = Field(default=8000, description="Server port")
+    workers: int = Field(default=1, description="Uvicorn worker processes")
+    keep_alive_timeout: int = Field(
+        default=75,
+        description="Seconds to hold idle keep-alive connections (above the proxy's idle timeout)",
+    )
 
     # Database
     database_url: str = Field(..., description="PostgreSQL connection URL")
+    db_pool_size: int = Field(default=20, description="Persistent connections per worker")
+    db_max_overflow: int = Field(default=10, description="Extra connections allowed under burst")
+    db_pool_recycle: int = Field(default=1800, description="Seconds before a connection is recycled")
+    db_pool_timeout: int = Field(default=10, description="Seconds to wait for a free connection")
+    db_pool_prewarm: bool = Field(default=True, description="Open pool connections at startup")
+    db_pgbouncer: bool = Field(
+        default=False,
+        description="DATABASE_URL points at PgBouncer in transaction pooling mode",
+    )
 
     # Redis
     redis_url: str = Field(..., description="Redis connection URL")
+    redis_max_connections: int = Field(default=100, description="Redis connection pool size")
+    redis_health_check_interval: int = Field(
+        default=30,
+        description="Seconds before an idle Redis connection is health-checked",
+    )
 
     # LLM Configuration
     llm_provider: str = Field(default="anthropic", description="LLM provider (anthropic|openai)")
     anthropic_api_key: str | None = Field(default=None, description="Anthropic API key")
     openai_api_key: str | None = Field(default=None, description="OpenAI API key")
     llm_model: str = Field(default="claude-opus-4-5", description="LLM model to use")
+    llm_fast_model: str | None = Field(
+        default=None,
+        description="Smaller model for short outputs such as explanations (defaults to llm_model)",
+    )
     llm_max_tokens: int = Field(default=4000, description="Max tokens for LLM responses")
     llm_temperature: float = Field(default=0.7, description="LLM temperature")
     llm_timeout: int = Field(default=30, description="LLM request timeout in seconds")
+    llm_total_timeout: int = Field(
+        default=60, description="Deadline in seconds for an LLM call including retries"
+    )
+    llm_cache_ttl_seconds: int = Field(default=3600, description="LLM response cache TTL")
+    llm_max_candidates: int = Field(
+        default=25,
+        ge=1,
+        description="Candidates sent to the LLM after local sound-profile ranking",
+    )
 
     # CORS
     cors_origins: str | List[str] = Field(
@@ -72,6 +110,11 @@ class Settings(BaseSettings):
     cache_ttl_session: int = Field(default=3600, description="Session cache TTL")
     cache_ttl_headphones: int = Field(default=600, description="Headphones cache TTL")
     cache_ttl_filters: int = Field(default=300, description="Filter results cache TTL")
+    cache_ttl_recommend: int = Field(
+        default=600,
+        description="How long identical preferences reuse an LLM ranking",
+    )
+    cache_ttl_explain: int = Field(default=86400, description="Explanation cache TTL")
 
     # Monitoring
     sentry_dsn: str | None = Field(default=None, description="Sentry DSN")
@@ -103,8 +146,9 @@ class Settings(BaseSettings):
             raise ValueError("llm_provider must be 'anthropic' or 'openai'")
         return v
 
-    def get_llm_api_key(self) -> str:
-        """Get the appropriate LLM API key based on provider."""
+    @cached_property
+    def llm_api_key(self) -> str:
+        """Get the appropriate LLM API key based on provider (resolved once)."""
         if self.llm_provider == "anthropic":
             if not self.anthropic_api_key:
                 raise ValueError("ANTHROPIC_API_KEY is required when using anthropic provider")
@@ -115,11 +159,27 @@ class Settings(BaseSettings):
             return self.openai_api_key
         raise ValueError(f"Unknown LLM provider: {self.llm_provider}")
 
+    @cached_property
+    def cors_origins_set(self) -> frozenset[str]:
+        """Allowed CORS origins as a set for O(1) membership checks."""
+        return frozenset(self.cors_origins)
+
+    @cached_property
+    def headphones_json(self) -> Path:
+        """Headphone catalog seed file (resolved once)."""
+        return self.data_dir.resolve() / "headphones.json"
+
     @property
     def database_url_sync(self) -> str:
         """Get synchronous database URL (for Alembic)."""
         return self.database_url.replace("+asyncpg", "")
 
 
+@lru_cache
+def get_settings() -> Settings:
+    """Get the process-wide settings instance (parsed from env once)."""
+    return Settings()
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
@@ -1,11 +1,17 @@
 """
 Redis cache wrapper for session caching and performance optimization.
 """
-import json
-from typing import Any, Optional
-import hashlib
+import asyncio
+import time
+import uuid
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Optional, TypeVar
 
+import orjson
 import redis.asyncio as redis
+import xxhash
+import zstandard
+from redis.exceptions import NoScriptError
 import structlog
 
 from app.config import settings
@@ -13,6 +19,61 @@ from app.core.exceptions import CacheException
 
 logger = structlog.get_logger()
 
+T = TypeVar("T")
+
+
+# Keys fetched per SCAN round-trip / removed per UNLINK command
+SCAN_BATCH_SIZE = 500
+
+# Rolling-window rate limiter (sorted set of request timestamps).
+# Trims entries older than the window, counts, and records the new request
+# in a single atomic round-trip.
+#   KEYS[1] = limiter key
+#   ARGV    = now_ms, window_ms, limit, member
+# Returns remaining requests in the window, or -1 if the limit is exceeded.
+RATE_LIMIT_SCRIPT = """
+local key = KEYS[1]
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
+local count = redis.call('ZCARD', key)
+if count < limit then
+    redis.call('ZADD', key, now, ARGV[4])
+    redis.call('PEXPIRE', key, window)
+    return limit - count - 1
+end
+return -1
+"""
+
+
+# Values at least this large are zstd-compressed before SET. Compressed
+# blobs start with the zstd frame magic, which can never begin a JSON
+# document, so plain and compressed entries can coexist.
+COMPRESSION_MIN_BYTES = 1024
+ZSTD_LEVEL = 3
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Session cache key, formatted with the session UUID
+SESSION_KEY = "session:%s"
+
+# Explanation cache key, formatted with the session and headphone UUIDs
+EXPLAIN_KEY = "explain:%s:%s"
+
+# Sound preferences are bucketed to tenths in recommendation keys; the LLM
+# prompt shows them at one decimal, so nearby values get the same answer
+SOUND_PREFERENCE_BUCKETS = 10
+
+# UUIDs and datetimes are serialized natively; naive datetimes are treated as UTC
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize types orjson does not handle natively."""
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
 
 class RedisCache:
     """
@@ -29,6 +90,13 @@ class RedisCache:
         """Initialize Redis connection pool."""
         self.redis: Optional[redis.Redis] = None
         self._initialized = False
+        self._rate_limit_sha: Optional[str] = None
+        # Strong references to write-behind tasks until they finish
+        self._pending_tasks: set[asyncio.Task] = set()
+        # In-flight loads keyed by cache key, for request coalescing
+        self._inflight: dict[str, asyncio.Future] = {}
+        self._zstd_c = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        self._zstd_d = zstandard.ZstdDecompressor()
 
     async def initialize(self):
         """Initialize Redis connection."""
@@ -36,13 +104,19 @@ class RedisCache:
             return
 
         try:
-            self.redis = await redis.from_url(
+            # Values are orjson blobs, so skip decoding responses to str
+            pool = redis.ConnectionPool.from_url(
                 settings.redis_url,
-                encoding="utf-8",
-                decode_responses=True,
+                max_connections=settings.redis_max_connections,
+                socket_keepalive=True,
+                health_check_interval=settings.redis_health_check_interval,
+                decode_responses=False,
             )
+            self.redis = redis.Redis(connection_pool=pool)
             # Test connection
             await self.redis.ping()
+            # Load rate limiter script once; requests then call EVALSHA
+            self._rate_limit_sha = await self.redis.script_load(RATE_LIMIT_SCRIPT)
             self._initialized = True
             logger.info("redis_connected", url=settings.redis_url)
 
@@ -52,9 +126,12 @@ class RedisCache:
             self._initialized = False
 
     async def close(self):
-        """Close Redis connection."""
+        """Flush pending background writes and close Redis connection."""
+        if self._pending_tasks:
+            await asyncio.gather(*self._pending_tasks, return_exceptions=True)
+
         if self.redis:
-            await self.redis.close()
+            await self.redis.aclose(close_connection_pool=True)
             logger.info("redis_connection_closed")
 
     async def get(self, key: str) -> Optional[Any]:
@@ -74,7 +151,33 @@ class RedisCache:
             value = await self.redis.get(key)
             if value:
                 logger.debug("cache_hit", key=key)
-                return json.loads(value)
+                return self._decode(value)
+            else:
+                logger.debug("cache_miss", key=key)
+                return None
+
+        except Exception as e:
+            logger.warning("cache_get_error", key=key, error=str(e))
+            return None
+
+    async def get_raw(self, key: str) -> Optional[bytes]:
+        """
+        Get a cached JSON document without deserializing it.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            JSON bytes (decompressed if needed), or None if not found
+        """
+        if not self._initialized or not self.redis:
+            return None
+
+        try:
+            value = await self.redis.get(key)
+            if value:
+                logger.debug("cache_hit", key=key)
+                return self._decompress(value)
             else:
                 logger.debug("cache_miss", key=key)
                 return None
@@ -83,6 +186,37 @@ class RedisCache:
             logger.warning("cache_get_error", key=key, error=str(e))
             return None
 
+    async def get_many(self, keys: list[str]) -> list[Optional[Any]]:
+        """
+        Get several values from cache in one MGET round-trip.
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Cached values in key order, None for missing keys
+        """
+        if not keys or not self._initialized or not self.redis:
+            return [None] * len(keys)
+
+        try:
+            values = await self.redis.mget(keys)
+            return [self._decode(value) if value else None for value in values]
+
+        except Exception as e:
+            logger.warning("cache_get_error", keys=len(keys), error=str(e))
+            return [None] * len(keys)
+
+    def _decompress(self, value: bytes) -> bytes:
+        """Return the JSON bytes of a stored value."""
+        if value.startswith(ZSTD_MAGIC):
+            return self._zstd_d.decompress(value)
+        return value
+
+    def _decode(self, value: bytes) -> Any:
+        """Deserialize a stored value, decompressing it if needed."""
+        return orjson.loads(self._decompress(value))
+
     async def set(
         self,
         key: str,
@@ -97,15 +231,44 @@ class RedisCache:
             value: Value to cache (will be JSON serialized)
             ttl: Time to live in seconds (None = no expiration)
         """
+        try:
+            serialized = orjson.dumps(value, default=_json_default, option=ORJSON_OPTIONS)
+        except TypeError as e:
+            logger.warning("cache_set_error", key=key, error=str(e))
+            return
+
+        await self.set_raw(key, serialized, ttl=ttl)
+
+    async def set_raw(
+        self,
+        key: str,
+        raw_json: str | bytes,
+        ttl: Optional[int] = None,
+    ):
+        """
+        Set an already-serialized JSON value in cache.
+
+        Payloads of COMPRESSION_MIN_BYTES or more are stored zstd-compressed.
+
+        Args:
+            key: Cache key
+            raw_json: JSON document (e.g. from Pydantic's model_dump_json)
+            ttl: Time to live in seconds (None = no expiration)
+        """
         if not self._initialized or not self.redis:
             return
 
+        if isinstance(raw_json, str):
+            raw_json = raw_json.encode()
+
+        if len(raw_json) >= COMPRESSION_MIN_BYTES:
+            raw_json = self._zstd_c.compress(raw_json)
+
         try:
-            serialized = json.dumps(value, default=str)
             if ttl:
-                await self.redis.setex(key, ttl, serialized)
+                await self.redis.setex(key, ttl, raw_json)
             else:
-                await self.redis.set(key, serialized)
+                await self.redis.set(key, raw_json)
 
             logger.debug("cache_set", key=key, ttl=ttl)
 
@@ -133,6 +296,9 @@ class RedisCache:
         """
         Delete all keys matching pattern.
 
+        Keys are removed with UNLINK (memory reclaimed in the background)
+        in batches queued on a single non-transactional pipeline.
+
         Args:
             pattern: Key pattern (e.g., "headphones:*")
         """
@@ -140,31 +306,99 @@ class RedisCache:
             return
 
         try:
-            keys = []
-            async for key in self.redis.scan_iter(match=pattern):
-                keys.append(key)
+            pipe = self.redis.pipeline(transaction=False)
+            batch = []
+            count = 0
+
+            async for key in self.redis.scan_iter(match=pattern, count=SCAN_BATCH_SIZE):
+                batch.append(key)
+                if len(batch) >= SCAN_BATCH_SIZE:
+                    pipe.unlink(*batch)
+                    count += len(batch)
+                    batch = []
 
-            if keys:
-                await self.redis.delete(*keys)
-                logger.debug("cache_delete_pattern", pattern=pattern, count=len(keys))
+            if batch:
+                pipe.unlink(*batch)
+                count += len(batch)
+
+            if count:
+                await pipe.execute()
+                logger.debug("cache_delete_pattern", pattern=pattern, count=count)
 
         except Exception as e:
             logger.warning("cache_delete_pattern_error", pattern=pattern, error=str(e))
 
+    async def single_flight(self, key: str, load: Callable[[], Awaitable[T]]) -> T:
+        """
+        Coalesce concurrent loads for the same key.
+
+        The first caller runs ``load``; callers arriving while it is in
+        flight await the same result instead of repeating the work. If that
+        caller is cancelled (client disconnect, caller timeout), waiting
+        callers are not: they retry, and one of them runs ``load`` again.
+
+        Args:
+            key: Key identifying the load (usually the cache key)
+            load: Coroutine factory performing the load on a cache miss
+
+        Returns:
+            Result of the shared load
+        """
+        while (future := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Only the leader's cancellation is retried, not our own
+                if not future.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+
+        try:
+            result = await load()
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an unobserved failure is not logged at GC
+            future.exception()
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._inflight.pop(key, None)
+
     # ============================================
     # High-level cache methods for specific use cases
     # ============================================
 
-    async def cache_session(self, session_id: str, data: dict):
+    async def cache_session(self, session_id: str, data: str):
         """
         Cache recommendation session.
 
         Args:
             session_id: Session UUID
-            data: Session data to cache
+            data: Session data to cache, already serialized as JSON
+        """
+        await self.set_raw(SESSION_KEY % session_id, data, ttl=settings.cache_ttl_session)
+
+    def cache_session_background(self, session_id: str, data: str):
+        """
+        Cache recommendation session without blocking the caller.
+
+        The write is scheduled as a task so the response is not held up by
+        the Redis round-trip; pending writes are flushed on close().
+
+        Args:
+            session_id: Session UUID
+            data: Session data to cache, already serialized as JSON
         """
-        key = f"session:{session_id}"
-        await self.set(key, data, ttl=settings.cache_ttl_session)
+        task = asyncio.create_task(self.cache_session(session_id, data))
+        self._pending_tasks.add(task)
+        task.add_done_callback(self._pending_tasks.discard)
 
     async def get_cached_session(self, session_id: str) -> Optional[dict]:
         """
@@ -176,69 +410,155 @@ class RedisCache:
         Returns:
             Cached session data or None
         """
-        key = f"session:{session_id}"
+        return await self.get(SESSION_KEY % session_id)
+
+    async def get_cached_sessions(self, session_ids: list[str]) -> dict[str, Optional[dict]]:
+        """
+        Get several cached recommendation sessions in one round-trip.
+
+        Args:
+            session_ids: Session UUIDs
+
+        Returns:
+            Mapping of session ID to cached session data (None on miss)
+        """
+        values = await self.get_many([SESSION_KEY % sid for sid in session_ids])
+        return dict(zip(session_ids, values))
+
+    async def cache_recommendation_result(self, preferences: dict, result: dict):
+        """
+        Cache the LLM ranking produced for a set of preferences.
+
+        Only the ranking is shared; each request still saves it as matches
+        of its own session, so session IDs are never handed to other users.
+
+        Args:
+            preferences: Everything the ranking depends on (profile, hard
+                constraints, number of results)
+            result: Parsed LLM recommendation response
+        """
+        key = self._recommendation_key(preferences)
+        await self.set(key, result, ttl=settings.cache_ttl_recommend)
+
+    async def get_cached_recommendation_result(self, preferences: dict) -> Optional[dict]:
+        """
+        Get the LLM ranking previously produced for these preferences.
+
+        Args:
+            preferences: Same shape as passed to cache_recommendation_result
+
+        Returns:
+            Parsed LLM recommendation response or None
+        """
+        key = self._recommendation_key(preferences)
         return await self.get(key)
 
-    async def cache_headphones(self, headphones: list[dict], filters: dict):
+    def _recommendation_key(self, preferences: dict) -> str:
+        """Build the recommendation key, with sound preferences bucketed."""
+        sound = preferences.get("sound_preferences") or {}
+        bucketed = {
+            **preferences,
+            "sound_preferences": {
+                dim: round(value * SOUND_PREFERENCE_BUCKETS) for dim, value in sound.items()
+            },
+        }
+        return f"recommend:{self._hash_dict(bucketed)}"
+
+    async def cache_explanation(self, session_id: str, headphone_id: str, explanation: dict):
         """
-        Cache filtered headphone results.
+        Cache the detailed explanation of a session's headphone match.
+
+        A session's matches do not change once saved, so the explanation
+        can be shared by every worker until the TTL expires.
 
         Args:
-            headphones: List of headphone dicts
-            filters: Filter parameters used
+            session_id: Session UUID
+            headphone_id: Headphone UUID
+            explanation: Explanation response data
+        """
+        key = EXPLAIN_KEY % (session_id, headphone_id)
+        await self.set(key, explanation, ttl=settings.cache_ttl_explain)
+
+    async def get_cached_explanation(self, session_id: str, headphone_id: str) -> Optional[dict]:
+        """
+        Get the cached explanation of a session's headphone match.
+
+        Args:
+            session_id: Session UUID
+            headphone_id: Headphone UUID
+
+        Returns:
+            Explanation response data or None
+        """
+        return await self.get(EXPLAIN_KEY % (session_id, headphone_id))
+
+    async def cache_headphones(self, page: bytes, filters: dict):
+        """
+        Cache a page of filtered headphone results.
+
+        Args:
+            page: Serialized paginated response (items, total, page, limit, pages)
+            filters: Filter parameters used, including pagination
         """
         # Create cache key from filters
         filter_hash = self._hash_dict(filters)
         key = f"headphones:filter:{filter_hash}"
-        await self.set(key, headphones, ttl=settings.cache_ttl_filters)
+        await self.set_raw(key, page, ttl=settings.cache_ttl_filters)
 
-    async def get_cached_headphones(self, filters: dict) -> Optional[list[dict]]:
+    async def get_cached_headphones(self, filters: dict) -> Optional[bytes]:
         """
-        Get cached headphone results.
+        Get a cached page of headphone results.
 
         Args:
-            filters: Filter parameters
+            filters: Filter parameters, including pagination
 
         Returns:
-            Cached headphones or None
+            Serialized paginated response or None
         """
         filter_hash = self._hash_dict(filters)
         key = f"headphones:filter:{filter_hash}"
-        return await self.get(key)
+        return await self.get_raw(key)
 
-    async def increment_rate_limit(
+    async def check_rate_limit(
         self,
         identifier: str,
         endpoint: str,
+        limit: int,
         window_seconds: int = 60,
     ) -> int:
         """
-        Increment rate limit counter.
+        Record a request against a rolling-window rate limit.
 
         Args:
             identifier: IP address or user ID
             endpoint: API endpoint
+            limit: Maximum requests allowed in the window
             window_seconds: Rate limit window
 
         Returns:
-            Current request count in window
+            Remaining requests in the window, or -1 if the limit is exceeded.
+            Fails open (returns limit) when Redis is unavailable.
         """
         if not self._initialized or not self.redis:
-            return 0
+            return limit
 
-        try:
-            key = f"ratelimit:{identifier}:{endpoint}"
-            count = await self.redis.incr(key)
+        key = f"ratelimit:{identifier}:{endpoint}"
+        now_ms = int(time.time() * 1000)
+        args = (now_ms, window_seconds * 1000, limit, f"{now_ms}:{uuid.uuid4().hex}")
 
-            # Set expiry on first request
-            if count == 1:
-                await self.redis.expire(key, window_seconds)
+        try:
+            try:
+                remaining = await self.redis.evalsha(self._rate_limit_sha, 1, key, *args)
+            except NoScriptError:
+                # Script cache was flushed (e.g. Redis restart) - reload and retry
+                self._rate_limit_sha = await self.redis.script_load(RATE_LIMIT_SCRIPT)
+                remaining = await self.redis.evalsha(self._rate_limit_sha, 1, key, *args)
 
-            return count
+            return int(remaining)
 
         except Exception as e:
             logger.warning("rate_limit_error", error=str(e))
-            return 0
+            return limit
 
     def _hash_dict(self, data: dict) -> str:
         """
@@ -248,12 +568,15 @@ class RedisCache:
             data: Dictionary to hash
 
         Returns:
-            MD5 hash string
+            xxh3-64 hex digest (non-cryptographic, keys only)
         """
-        # Sort keys for consistent hashing
-        sorted_items = sorted(data.items())
-        data_str = json.dumps(sorted_items, sort_keys=True, default=str)
-        return hashlib.md5(data_str.encode()).hexdigest()
+        # OPT_SORT_KEYS gives canonical ordering for consistent hashing
+        payload = orjson.dumps(
+            data,
+            default=_json_default,
+            option=ORJSON_OPTIONS | orjson.OPT_SORT_KEYS,
+        )
+        return xxhash.xxh3_64_hexdigest(payload)
 
 
 # Global cache instance
@@ -0,0 +1,151 @@
+"""
+Deferred structured logging for the request hot path.
+
+Request middleware enqueues log events instead of rendering and writing
+them inline; a single background task drains the queue. When the queue is
+full, events are dropped rather than blocking the request.
+
+Rendered lines from every logger are handed to a writer thread, so the
+event loop never blocks on a write or flush to stdout.
+"""
+import asyncio
+import queue
+import threading
+from typing import Any, BinaryIO, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+# Events buffered before new ones are dropped
+LOG_QUEUE_MAXSIZE = 10_000
+
+
+class AsyncLogQueue:
+    """Bounded queue of log events drained by one background task."""
+
+    def __init__(self, maxsize: int = LOG_QUEUE_MAXSIZE):
+        """
+        Args:
+            maxsize: Maximum number of buffered events
+        """
+        self.maxsize = maxsize
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Create the queue and start draining it on the running loop."""
+        self._queue = asyncio.Queue(maxsize=self.maxsize)
+        self._task = asyncio.create_task(self._drain())
+
+    async def stop(self):
+        """Stop the drain task and write out any buffered events."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+        while not self._queue.empty():
+            event, fields = self._queue.get_nowait()
+            logger.info(event, **fields)
+
+        if self.dropped:
+            logger.warning("log_events_dropped", count=self.dropped)
+
+        self._queue = None
+        self._task = None
+
+    def info(self, event: str, **fields: Any):
+        """
+        Enqueue an info-level event.
+
+        Falls back to logging inline when the queue is not running
+        (e.g. before startup or in scripts).
+        """
+        if self._queue is None:
+            logger.info(event, **fields)
+            return
+
+        try:
+            self._queue.put_nowait((event, fields))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    async def _drain(self):
+        """Write queued events until cancelled."""
+        while True:
+            event, fields = await self._queue.get()
+            logger.info(event, **fields)
+
+
+class QueueBytesLogger:
+    """structlog logger that queues rendered lines for ThreadedLogWriter."""
+
+    __slots__ = ("_put",)
+
+    def __init__(self, put):
+        self._put = put
+
+    def msg(self, message: bytes):
+        self._put(message)
+
+    log = debug = info = warn = warning = msg
+    fatal = failure = err = error = critical = exception = msg
+
+
+class ThreadedLogWriter:
+    """
+    structlog logger factory backed by one writer thread.
+
+    Loggers only enqueue bytes; the thread writes them and flushes once
+    the queue is empty, so a burst of lines costs one flush instead of
+    one per line (structlog.BytesLogger flushes every message).
+    """
+
+    def __init__(self, stream: BinaryIO):
+        """
+        Args:
+            stream: Binary stream to write lines to (e.g. sys.stdout.buffer)
+        """
+        self._stream = stream
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def __call__(self, *args: Any) -> QueueBytesLogger:
+        """Create a logger (structlog passes the logger name, unused)."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="log-writer", daemon=True
+                )
+                self._thread.start()
+        return QueueBytesLogger(self._queue.put)
+
+    def stop(self):
+        """Write out queued lines and stop the thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _run(self):
+        """Write queued lines until stopped."""
+        while True:
+            line = self._queue.get()
+            if line is None:
+                break
+            self._stream.write(line + b"\n")
+            if self._queue.empty():
+                self._stream.flush()
+        self._stream.flush()
+
+
+# Global request log queue
+request_log = AsyncLogQueue()
@@ -0,0 +1,71 @@
+"""
+Custom ASGI middleware.
+"""
+from typing import Awaitable, Callable
+
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class FrozenSetCORSMiddleware(CORSMiddleware):
+    """
+    CORS middleware with O(1) allow-list checks.
+
+    Starlette keeps origins, methods and headers as lists and scans them on
+    every request/preflight. The response header values are built once in
+    __init__, so the lists can be swapped for frozensets afterwards.
+    """
+
+    def __init__(self, app: ASGIApp, **kwargs) -> None:
+        super().__init__(app, **kwargs)
+        self.allow_origins = frozenset(self.allow_origins)
+        self.allow_methods = frozenset(self.allow_methods)
+        self.allow_headers = frozenset(self.allow_headers)
+
+
+class UnhandledErrorMiddleware:
+    """
+    Turn unhandled exceptions into responses inside the middleware stack.
+
+    Starlette runs a handler registered for Exception in its outermost
+    ServerErrorMiddleware, outside CORS, so those 500s would lack CORS
+    headers and the browser would see an opaque network error. Added inside
+    the CORS middleware, this calls the same kind of handler from there.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        handler: Callable[[Request, Exception], Awaitable[Response]],
+    ) -> None:
+        """
+        Args:
+            app: Wrapped ASGI application
+            handler: Builds the response for an unhandled exception
+        """
+        self.app = app
+        self.handler = handler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception as exc:
+            # Too late for an error response once headers are out
+            if response_started:
+                raise
+            response = await self.handler(Request(scope), exc)
+            await response(scope, receive, send)
@@ -0,0 +1,83 @@
+"""
+Redis-backed rate limiting middleware.
+
+Limits are enforced with a rolling-window sorted set in Redis, so counters
+are shared across all API workers instead of being kept per process. The
+check runs at the ASGI boundary, before routing and body parsing, so
+rejected requests cost one Redis round-trip.
+"""
+import orjson
+import structlog
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.config import settings
+from app.core.cache import cache
+
+logger = structlog.get_logger()
+
+
+class RateLimitMiddleware:
+    """
+    Per-IP rate limiting for selected endpoints.
+
+    Limits are looked up by exact request path; unlisted paths pass
+    through untouched.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limits: dict[str, tuple[str, int]],
+        window_seconds: int = 60,
+    ) -> None:
+        """
+        Args:
+            app: Wrapped ASGI application
+            limits: Mapping of path -> (endpoint name, requests per window)
+            window_seconds: Rate limit window
+        """
+        self.app = app
+        self.limits = limits
+        self.window_seconds = window_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not settings.rate_limit_enabled:
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.limits.get(scope["path"])
+        if rule is None:
+            await self.app(scope, receive, send)
+            return
+
+        endpoint, limit = rule
+        client = scope.get("client")
+        identifier = client[0] if client else "127.0.0.1"
+
+        remaining = await cache.check_rate_limit(
+            identifier, endpoint, limit, self.window_seconds
+        )
+
+        if remaining < 0:
+            logger.warning("rate_limit_exceeded", endpoint=endpoint, client_ip=identifier)
+            await self._reject(send, limit)
+            return
+
+        await self.app(scope, receive, send)
+
+    async def _reject(self, send: Send, limit: int) -> None:
+        """Send a 429 response."""
+        body = orjson.dumps({
+            "error": "Rate limit exceeded",
+            "detail": {"limit": limit, "window_seconds": self.window_seconds},
+        })
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(self.window_seconds).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -2,21 +2,44 @@
 Database session management.
 Provides async database session for FastAPI dependencies.
 """
+import asyncio
+import uuid
 from typing import AsyncGenerator
 
+import structlog
+from sqlalchemy import event
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
-from sqlalchemy.pool import NullPool
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import settings
 
+logger = structlog.get_logger()
+
+
+# Behind PgBouncer in transaction mode, consecutive transactions may run on
+# different server connections, so prepared statements cannot be cached
+# per connection, and their names must be unique across all clients
+connect_args = {}
+if settings.db_pgbouncer:
+    connect_args = {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "prepared_statement_name_func": lambda: f"__asyncpg_{uuid.uuid4()}__",
+    }
 
 # Create async engine
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
     future=True,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=settings.db_pool_size,
+    max_overflow=settings.db_max_overflow,
+    pool_recycle=settings.db_pool_recycle,
+    pool_timeout=settings.db_pool_timeout,
     pool_pre_ping=True,
-    poolclass=NullPool if settings.debug else None,
+    connect_args=connect_args,
 )
 
 # Create session factory
@@ -29,10 +52,37 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+@event.listens_for(Session, "after_flush")
+def _mark_flushed(session: Session, flush_context) -> None:
+    """Record that the session has written rows, so get_db knows to commit."""
+    session.info["flushed"] = True
+
+
+async def warm_pool() -> None:
+    """
+    Open the pool's persistent connections concurrently at startup.
+
+    SQLAlchemy connects lazily, so without this the first requests after a
+    deploy each pay for a TCP/TLS handshake and authentication.
+    """
+    try:
+        connections = await asyncio.gather(
+            *(engine.connect() for _ in range(settings.db_pool_size))
+        )
+        await asyncio.gather(*(conn.close() for conn in connections))
+        logger.info("db_pool_warmed", connections=len(connections))
+
+    except Exception as e:
+        logger.warning("db_pool_warm_failed", error=str(e))
+
+
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
     """
     Dependency to get database session.
 
+    The session is committed only if it has pending or flushed changes;
+    read-only requests just release their connection.
+
     Usage in FastAPI endpoint:
         @app.get("/items")
         async def get_items(db: AsyncSession = Depends(get_db)):
@@ -41,7 +91,8 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
     async with AsyncSessionLocal() as session:
         try:
             yield session
-            await session.commit()
+            if session.new or session.dirty or session.deleted or session.info.get("flushed"):
+                await session.commit()
         except Exception:
             await session.rollback()
             raise
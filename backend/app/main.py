@@ -2,54 +2,77 @@
 SonicMatch Backend - FastAPI Application Entry Point
 AI-powered headphone recommendation service
 """
+import asyncio
+import atexit
+import logging
+import sys
 import time
 from contextlib import asynccontextmanager
+from http import HTTPStatus
 from typing import AsyncGenerator
 
 from fastapi import FastAPI, Request, status
-from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.errors import RateLimitExceeded
-from slowapi.util import get_remote_address
+from fastapi.responses import ORJSONResponse
+import orjson
 import structlog
 
 from app.config import settings
 from app.core.exceptions import SonicMatchException
 from app.core.cache import cache
+from app.core.log_queue import ThreadedLogWriter, request_log
+from app.core.middleware import FrozenSetCORSMiddleware, UnhandledErrorMiddleware
+from app.core.rate_limit import RateLimitMiddleware
+from app.db.session import engine, warm_pool
 from app.api.v1.router import router as api_v1_router
+from app.services.analytics import analytics
+from app.services.llm_client import llm_client
 
 
-# Configure structured logging
+# Configure structured logging. Lines are written and flushed by a
+# background thread; anything still queued is written out at exit
+log_writer = ThreadedLogWriter(sys.stdout.buffer)
+atexit.register(log_writer.stop)
+
 structlog.configure(
     processors=[
         structlog.processors.TimeStamper(fmt="iso"),
         structlog.processors.add_log_level,
-        structlog.processors.JSONRenderer()
-    ]
+        structlog.processors.JSONRenderer(serializer=orjson.dumps),
+    ],
+    # Calls below the configured level are no-ops: no processors run and
+    # nothing is rendered or written (the cache logs every hit at debug)
+    wrapper_class=structlog.make_filtering_bound_logger(
+        logging.getLevelName(settings.log_level.upper())
+    ),
+    # orjson renders bytes, so they go to stdout's buffer as-is
+    logger_factory=log_writer,
+    cache_logger_on_first_use=True,
 )
 
 logger = structlog.get_logger()
 
 
-# Rate limiter
-limiter = Limiter(
-    key_func=get_remote_address,
-    default_limits=[f"{settings.rate_limit_per_minute}/minute"] if settings.rate_limit_enabled else []
-)
-
-
 @asynccontextmanager
 async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     """Application lifespan events."""
     # Startup
     logger.info("starting_application", app_name=settings.app_name)
 
-    # Initialize Redis cache
-    await cache.initialize()
+    # Drain request logs off the hot path
+    request_log.start()
+
+    # Initialize Redis cache and open database connections concurrently;
+    # both are independent network handshakes
+    startup = [cache.initialize()]
+    if settings.db_pool_prewarm:
+        startup.append(warm_pool())
+    await asyncio.gather(*startup)
+
+    # Start the batched analytics writer
+    analytics.start()
 
-    # TODO: Initialize database connection pool
     # TODO: Ping external services
 
     yield
@@ -57,10 +80,14 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     # Shutdown
     logger.info("shutting_down_application")
 
-    # Close Redis connection
-    await cache.close()
+    # Flush buffered analytics before the database pool goes away
+    await analytics.stop()
 
-    # TODO: Close database connections
+    # Close Redis, database and LLM API connections
+    await asyncio.gather(cache.close(), engine.dispose(), llm_client.close())
+
+    # Flush buffered request logs
+    await request_log.stop()
 
 
 # Create FastAPI application
@@ -71,27 +98,44 @@ app = FastAPI(
     docs_url="/docs" if settings.debug else None,
     redoc_url="/redoc" if settings.debug else None,
     openapi_url="/openapi.json" if settings.debug else None,
+    default_response_class=ORJSONResponse,
     lifespan=lifespan,
 )
 
-# Attach limiter to app
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
-
 # ============================================
 # Middleware
 # ============================================
 
+# Rate Limiting Middleware (added before CORS so 429s still carry CORS headers)
+app.add_middleware(
+    RateLimitMiddleware,
+    limits={
+        f"{settings.api_v1_prefix}/recommend": ("recommend", settings.rate_limit_recommend),
+        f"{settings.api_v1_prefix}/explain": ("explain", settings.rate_limit_explain),
+        f"{settings.api_v1_prefix}/headphones": ("headphones", settings.rate_limit_headphones),
+    },
+)
+
+# Unexpected errors become 500 responses here, inside CORS, so they still
+# carry CORS headers (the handler is defined under Exception Handlers)
+app.add_middleware(
+    UnhandledErrorMiddleware,
+    handler=lambda request, exc: general_exception_handler(request, exc),
+)
+
 # CORS Middleware
 app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.cors_origins,
+    FrozenSetCORSMiddleware,
+    allow_origins=list(settings.cors_origins_set),
     allow_credentials=settings.cors_credentials,
     allow_methods=settings.cors_methods,
     allow_headers=settings.cors_headers,
 )
 
+# Response compression (JSON bodies of 1 KiB and up, for clients sending
+# Accept-Encoding: gzip; nginx passes already-encoded responses through)
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Trusted Host Middleware (security)
 if not settings.debug:
     app.add_middleware(
@@ -103,11 +147,11 @@ if not settings.debug:
 # Request logging middleware
 @app.middleware("http")
 async def log_requests(request: Request, call_next):
-    """Log all HTTP requests."""
-    start_time = time.time()
+    """Log all HTTP requests (queued, written by a background task)."""
+    start_time = time.perf_counter()
 
     # Log request
-    logger.info(
+    request_log.info(
         "request_started",
         method=request.method,
         path=request.url.path,
@@ -118,8 +162,8 @@ async def log_requests(request: Request, call_next):
     response = await call_next(request)
 
     # Log response
-    process_time = time.time() - start_time
-    logger.info(
+    process_time = time.perf_counter() - start_time
+    request_log.info(
         "request_completed",
         method=request.method,
         path=request.url.path,
@@ -137,31 +181,43 @@ async def log_requests(request: Request, call_next):
 # Exception Handlers
 # ============================================
 
+# Endpoints do not catch errors themselves; service exceptions propagate
+# here and are mapped to their status codes in one place.
+
 @app.exception_handler(SonicMatchException)
 async def sonicmatch_exception_handler(request: Request, exc: SonicMatchException):
     """Handle custom SonicMatch exceptions."""
     logger.error(
         "sonicmatch_exception",
-        error=str(exc),
+        error=exc.message,
         error_type=exc.__class__.__name__,
-        path=request.url.path,
-    )
-    return JSONResponse(
         status_code=exc.status_code,
-        content={"error": exc.message, "detail": exc.detail},
+        path=request.url.path,
     )
 
+    # Server-side failures may carry internal details; only expose them in debug
+    if exc.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR and not settings.debug:
+        content = {"error": HTTPStatus(exc.status_code).phrase, "detail": None}
+    else:
+        content = {"error": exc.message, "detail": exc.detail}
+
+    return ORJSONResponse(status_code=exc.status_code, content=content)
+
 
-@app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
-    """Handle all unhandled exceptions."""
+    """
+    Handle all unhandled exceptions.
+
+    Called by UnhandledErrorMiddleware rather than registered with
+    app.exception_handler, which would run outside the CORS middleware.
+    """
     logger.error(
         "unhandled_exception",
         error=str(exc),
         error_type=exc.__class__.__name__,
         path=request.url.path,
     )
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={"error": "Internal server error", "detail": str(exc) if settings.debug else None},
     )
@@ -223,10 +279,17 @@ app.include_router(api_v1_router, prefix=settings.api_v1_prefix)
 if __name__ == "__main__":
     import uvicorn
 
+    # uvloop and httptools ship with uvicorn[standard]; naming them makes a
+    # missing extra fail loudly instead of silently using the slower defaults
     uvicorn.run(
         "app.main:app",
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        workers=None if settings.debug else settings.workers,
+        loop="uvloop",
+        http="httptools",
+        timeout_keep_alive=settings.keep_alive_timeout,
+        backlog=2048,
         log_level=settings.log_level.lower(),
     )
@@ -5,7 +5,12 @@ Export all models for easy import.
 from app.models.analytics import AnalyticsEvent
 from app.models.headphone import Headphone, HeadphoneType, BackType, PriceTier
 from app.models.preference import UserPreference, UseCase
-from app.models.recommendation import RecommendationSession, HeadphoneMatch, SessionStatus
+from app.models.recommendation import (
+    RecommendationSession,
+    HeadphoneMatch,
+    SessionStatus,
+    SCORE_SCALE,
+)
 from app.models.user import User
 
 __all__ = [
@@ -21,6 +26,7 @@ __all__ = [
     "RecommendationSession",
     "HeadphoneMatch",
     "SessionStatus",
+    "SCORE_SCALE",
     # User
     "User",
     # Analytics
@@ -5,7 +5,7 @@ from typing import Optional
 import uuid
 
 from sqlalchemy import String, Index
-from sqlalchemy.dialects.postgresql import JSON, UUID
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.base import Base, TimestampMixin, UUIDMixin
@@ -35,13 +35,13 @@ class AnalyticsEvent(Base, UUIDMixin, TimestampMixin):
         index=True,
     )
 
-    # Event Metadata (flexible JSON)
+    # Event Metadata (flexible JSON, stored as JSONB for indexed queries)
     # Examples:
     # - session_created: {"preference_count": 5, "budget": 400}
     # - recommendation_generated: {"headphone_count": 3, "processing_time_ms": 1234}
     # - llm_call: {"provider": "anthropic", "tokens": 1500, "cost": 0.05}
     event_metadata: Mapped[dict] = mapped_column(
-        JSON,
+        JSONB,
         nullable=False,
         default=dict,
     )
@@ -50,6 +50,7 @@ class AnalyticsEvent(Base, UUIDMixin, TimestampMixin):
     __table_args__ = (
         Index("ix_analytics_type_created", "event_type", "created_at"),
         Index("ix_analytics_session_created", "session_id", "created_at"),
+        Index("ix_analytics_metadata_gin", "event_metadata", postgresql_using="gin"),
     )
 
     def __repr__(self) -> str:
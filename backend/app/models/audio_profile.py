@@ -3,12 +3,22 @@ Audio Profile Feature Engineering
 Converts Spotify audio features into interpretable headphone preference vectors
 """
 
-from dataclasses import dataclass
+from collections import Counter
+from dataclasses import dataclass, replace
+from functools import cache
 from typing import List, Dict, Optional
-import numpy as np
 from enum import Enum
 
 
+# Manual slider key -> AudioProfile field blended by enhance_with_manual_preferences
+BLEND_FIELDS = (
+    ('bass', 'bass_preference'),
+    ('mids', 'mids_preference'),
+    ('treble', 'treble_preference'),
+    ('soundstage', 'soundstage_width'),
+)
+
+
 class SoundCharacteristic(Enum):
     """Sound characteristics that map to headphone tuning"""
     BASS_HEAVY = "bass_heavy"
@@ -19,11 +29,11 @@ class SoundCharacteristic(Enum):
     DARK = "dark"
 
 
-@dataclass
+@dataclass(slots=True)
 class AudioProfile:
     """
     Unified audio preference profile derived from user's music taste
-    All values normalized 0-1
+    All values normalized 0-1 (slotted: profiles are built per request)
     """
     # Frequency response preferences
     bass_preference: float  # 0=neutral, 1=bass-head
@@ -77,6 +87,34 @@ class AudioProfile:
             return SoundCharacteristic.BALANCED
 
 
+def _clip01(value: float) -> float:
+    """Clamp a scalar to [0, 1] (builtins avoid NumPy's per-call dispatch)"""
+    return min(1.0, max(0.0, value))
+
+
+def _copy_profile(profile: AudioProfile) -> AudioProfile:
+    """Copy a cached profile so callers cannot mutate the cached one"""
+    return replace(profile, genre_weights=dict(profile.genre_weights))
+
+
+@cache
+def _neutral_profile() -> AudioProfile:
+    """Neutral profile, built once"""
+    return AudioProfile(
+        bass_preference=0.5,
+        mids_preference=0.5,
+        treble_preference=0.5,
+        soundstage_width=0.5,
+        imaging_precision=0.5,
+        warmth=0.5,
+        brightness=0.5,
+        energy_level=0.5,
+        dynamic_range=0.5,
+        genre_weights={},
+        confidence=0.0
+    )
+
+
 class SpotifyFeatureExtractor:
     """
     Extracts audio profile from Spotify audio features
@@ -91,6 +129,18 @@ class SpotifyFeatureExtractor:
     - loudness: overall loudness in dB
     """
 
+    # Spotify audio features aggregated per track, in matrix column order
+    FEATURE_KEYS = (
+        'danceability',
+        'energy',
+        'acousticness',
+        'instrumentalness',
+        'valence',
+        'tempo',
+        'loudness',
+        'speechiness',
+    )
+
     # Genre to sound profile mappings (based on audio research)
     GENRE_PROFILES = {
         'edm': {'bass': 0.9, 'energy': 0.9, 'brightness': 0.8},
@@ -120,42 +170,25 @@ class SpotifyFeatureExtractor:
         if not tracks:
             return SpotifyFeatureExtractor._default_profile()
 
-        # Aggregate features
-        features = {
-            'danceability': [],
-            'energy': [],
-            'acousticness': [],
-            'instrumentalness': [],
-            'valence': [],
-            'tempo': [],
-            'loudness': [],
-            'speechiness': []
-        }
-
-        genres = {}
-
-        for track in tracks:
-            for key in features.keys():
-                if key in track and track[key] is not None:
-                    features[key].append(float(track[key]))
-
-            # Track genres
-            if 'playlist_genre' in track:
-                genre = track['playlist_genre'].lower()
-                genres[genre] = genres.get(genre, 0) + 1
-
-        # Calculate averages
-        avg_features = {
-            k: np.mean(v) if v else 0.5
-            for k, v in features.items()
-        }
+        # Per-feature mean over the tracks that have it, 0.5 if none do.
+        # Tracks come from the wizard (tens, not thousands), where builtin
+        # sum/len over the transposed rows beats building a NumPy array
+        keys = SpotifyFeatureExtractor.FEATURE_KEYS
+        rows = [[track.get(key) for key in keys] for track in tracks]
+        avg_features = {}
+        for key, column in zip(keys, zip(*rows)):
+            values = [float(value) for value in column if value is not None]
+            avg_features[key] = sum(values) / len(values) if values else 0.5
+
+        # Track genres, counted in one C-level pass (tracks without a
+        # genre, or with an empty one, are skipped)
+        genres = Counter(
+            genre.lower() for track in tracks if (genre := track.get('playlist_genre'))
+        )
 
         # Normalize genre weights
         total_tracks = len(tracks)
-        genre_weights = {
-            g: count / total_tracks
-            for g, count in genres.items()
-        }
+        genre_weights = {g: count / total_tracks for g, count in genres.items()}
 
         # Map to audio profile
         return SpotifyFeatureExtractor._map_to_profile(avg_features, genre_weights, len(tracks))
@@ -163,32 +196,25 @@ class SpotifyFeatureExtractor:
     @staticmethod
     def _map_to_profile(features: Dict, genres: Dict[str, float], track_count: int) -> AudioProfile:
         """Map Spotify features to AudioProfile"""
+        # Read each feature once; the formulas below reuse them
+        energy = features['energy']
+        danceability = features['danceability']
+        acousticness = features['acousticness']
+        instrumentalness = features['instrumentalness']
+        valence = features['valence']
+        electronic = 1 - acousticness
 
         # Bass: High energy + high danceability + low acousticness
-        bass_pref = (
-            features['energy'] * 0.4 +
-            features['danceability'] * 0.4 +
-            (1 - features['acousticness']) * 0.2
-        )
+        bass_pref = energy * 0.4 + danceability * 0.4 + electronic * 0.2
 
         # Mids: Low instrumentalness (vocals) + mid-range acousticness
-        mids_pref = (
-            (1 - features['instrumentalness']) * 0.6 +
-            features['acousticness'] * 0.4
-        )
+        mids_pref = (1 - instrumentalness) * 0.6 + acousticness * 0.4
 
         # Treble: High energy + high valence (brightness)
-        treble_pref = (
-            features['energy'] * 0.5 +
-            features['valence'] * 0.3 +
-            (1 - features['acousticness']) * 0.2
-        )
+        treble_pref = energy * 0.5 + valence * 0.3 + electronic * 0.2
 
         # Soundstage: Acousticness + instrumentalness
-        soundstage = (
-            features['acousticness'] * 0.6 +
-            features['instrumentalness'] * 0.4
-        )
+        soundstage = acousticness * 0.6 + instrumentalness * 0.4
 
         # Imaging: Inverse of loudness (compressed music = less imaging need)
         # Normalize loudness from typical range [-60, 0] dB
@@ -196,40 +222,30 @@ class SpotifyFeatureExtractor:
         imaging = 1 - (normalized_loudness * 0.5)  # Less compression = more imaging need
 
         # Warmth: Low energy + high valence + acousticness
-        warmth = (
-            (1 - features['energy']) * 0.3 +
-            features['valence'] * 0.3 +
-            features['acousticness'] * 0.4
-        )
+        warmth = (1 - energy) * 0.3 + valence * 0.3 + acousticness * 0.4
 
         # Brightness: High energy + high valence
-        brightness = (
-            features['energy'] * 0.6 +
-            features['valence'] * 0.4
-        )
+        brightness = energy * 0.6 + valence * 0.4
 
         # Energy: Direct mapping
-        energy_level = features['energy']
+        energy_level = energy
 
         # Dynamic range: Inverse of loudness + acousticness
-        dynamic_range = (
-            (1 - normalized_loudness) * 0.6 +
-            features['acousticness'] * 0.4
-        )
+        dynamic_range = (1 - normalized_loudness) * 0.6 + acousticness * 0.4
 
         # Confidence based on track count
         confidence = min(1.0, track_count / 20)  # Full confidence at 20+ tracks
 
         return AudioProfile(
-            bass_preference=np.clip(bass_pref, 0, 1),
-            mids_preference=np.clip(mids_pref, 0, 1),
-            treble_preference=np.clip(treble_pref, 0, 1),
-            soundstage_width=np.clip(soundstage, 0, 1),
-            imaging_precision=np.clip(imaging, 0, 1),
-            warmth=np.clip(warmth, 0, 1),
-            brightness=np.clip(brightness, 0, 1),
+            bass_preference=_clip01(bass_pref),
+            mids_preference=_clip01(mids_pref),
+            treble_preference=_clip01(treble_pref),
+            soundstage_width=_clip01(soundstage),
+            imaging_precision=_clip01(imaging),
+            warmth=_clip01(warmth),
+            brightness=_clip01(brightness),
             energy_level=energy_level,
-            dynamic_range=np.clip(dynamic_range, 0, 1),
+            dynamic_range=_clip01(dynamic_range),
             genre_weights=genres,
             confidence=confidence
         )
@@ -237,19 +253,7 @@ class SpotifyFeatureExtractor:
     @staticmethod
     def _default_profile() -> AudioProfile:
         """Default neutral profile"""
-        return AudioProfile(
-            bass_preference=0.5,
-            mids_preference=0.5,
-            treble_preference=0.5,
-            soundstage_width=0.5,
-            imaging_precision=0.5,
-            warmth=0.5,
-            brightness=0.5,
-            energy_level=0.5,
-            dynamic_range=0.5,
-            genre_weights={},
-            confidence=0.0
-        )
+        return _copy_profile(_neutral_profile())
 
     @staticmethod
     def enhance_with_manual_preferences(
@@ -265,20 +269,18 @@ class SpotifyFeatureExtractor:
             manual_prefs: Dict with 'bass', 'mids', 'treble', etc.
             blend_weight: Weight for manual prefs (0-1), default 0.7 = 70% manual
         """
-        return AudioProfile(
-            bass_preference=blend_weight * manual_prefs.get('bass', profile.bass_preference) +
-                          (1 - blend_weight) * profile.bass_preference,
-            mids_preference=blend_weight * manual_prefs.get('mids', profile.mids_preference) +
-                          (1 - blend_weight) * profile.mids_preference,
-            treble_preference=blend_weight * manual_prefs.get('treble', profile.treble_preference) +
-                            (1 - blend_weight) * profile.treble_preference,
-            soundstage_width=blend_weight * manual_prefs.get('soundstage', profile.soundstage_width) +
-                           (1 - blend_weight) * profile.soundstage_width,
-            imaging_precision=profile.imaging_precision,  # Keep calculated
-            warmth=profile.warmth,  # Keep calculated
-            brightness=profile.brightness,  # Keep calculated
-            energy_level=profile.energy_level,
-            dynamic_range=profile.dynamic_range,
-            genre_weights=profile.genre_weights,
+        # Convex combination of the manual and extracted values for the
+        # slider-backed fields; everything else is kept as calculated
+        keep_weight = 1 - blend_weight
+        blended = {}
+        for key, field_name in BLEND_FIELDS:
+            extracted = getattr(profile, field_name)
+            blended[field_name] = (
+                blend_weight * manual_prefs.get(key, extracted) + keep_weight * extracted
+            )
+
+        return replace(
+            profile,
+            **blended,
             confidence=max(profile.confidence, 0.8)  # Boost confidence with manual input
         )
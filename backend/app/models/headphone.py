@@ -2,16 +2,23 @@
 Headphone model - Database catalog of all headphones.
 """
 import enum
+import uuid
+from datetime import datetime
 from decimal import Decimal
 from typing import List
 
 from sqlalchemy import Enum, Index, Numeric, String, Text
-from sqlalchemy.dialects.postgresql import ARRAY, JSON
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base, TimestampMixin, UUIDMixin
 
 
+# Catalog rows rarely change, so their dict form is built once per process
+# and reused across requests: headphone ID -> (updated_at, dict)
+_dict_cache: dict[uuid.UUID, tuple[datetime, dict]] = {}
+
+
 class HeadphoneType(str, enum.Enum):
     """Headphone form factor types."""
     OVER_EAR = "over_ear"
@@ -83,39 +90,39 @@ class Headphone(Base, UUIDMixin, TimestampMixin):
     sound_signature: Mapped[str] = mapped_column(String(50), nullable=False)
     description: Mapped[str] = mapped_column(Text, nullable=False)
 
-    # Structured Data (JSON)
+    # Structured Data (JSONB)
     key_features: Mapped[List[str]] = mapped_column(
-        JSON,
+        JSONB,
         nullable=False,
         default=list,
     )
     pros: Mapped[List[str]] = mapped_column(
-        JSON,
+        JSONB,
         nullable=False,
         default=list,
     )
     cons: Mapped[List[str]] = mapped_column(
-        JSON,
+        JSONB,
         nullable=False,
         default=list,
     )
 
-    # Detailed Specifications (JSON)
+    # Detailed Specifications (JSONB)
     # Format: {"bass": 0.7, "mids": 0.6, "treble": 0.5, "soundstage": 0.8, "detail": 0.7}
     detailed_specs: Mapped[dict] = mapped_column(
-        JSON,
+        JSONB,
         nullable=False,
         default=dict,
     )
 
-    # Target Audience (JSON Arrays)
+    # Target Audience (JSONB Arrays)
     target_genres: Mapped[List[str]] = mapped_column(
-        JSON,
+        JSONB,
         nullable=False,
         default=list,
     )
     target_use_cases: Mapped[List[str]] = mapped_column(
-        JSON,
+        JSONB,
         nullable=False,
         default=list,
     )
@@ -138,7 +145,26 @@ class Headphone(Base, UUIDMixin, TimestampMixin):
         return f"<Headphone {self.full_name} (${self.price_usd})>"
 
     def to_dict(self) -> dict:
-        """Convert model to dictionary."""
+        """
+        Convert model to dictionary.
+
+        The result is memoized per headphone and invalidated when
+        updated_at changes. It is shared between callers, so treat it as
+        read-only.
+        """
+        if self.id is None:
+            return self._build_dict()
+
+        cached = _dict_cache.get(self.id)
+        if cached is not None and cached[0] == self.updated_at:
+            return cached[1]
+
+        data = self._build_dict()
+        _dict_cache[self.id] = (self.updated_at, data)
+        return data
+
+    def _build_dict(self) -> dict:
+        """Build the dictionary form of this headphone."""
         return {
             "id": str(self.id),
             "brand": self.brand,
@@ -3,11 +3,10 @@ User Preference model - Stores user's music and headphone preferences.
 """
 import enum
 import uuid
-from decimal import Decimal
 from typing import List, Optional
 
-from sqlalchemy import ForeignKey, Numeric, String, Text
-from sqlalchemy.dialects.postgresql import JSON, UUID
+from sqlalchemy import Float, ForeignKey, Index, String, Text
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base, TimestampMixin, UUIDMixin
@@ -49,19 +48,19 @@ class UserPreference(Base, UUIDMixin, TimestampMixin):
         index=True,
     )
 
-    # Music Preferences (JSON Arrays)
+    # Music Preferences (JSONB arrays, containment-queryable)
     genres: Mapped[List[str]] = mapped_column(
-        JSON,
+        JSONB,
         nullable=False,
         default=list,
     )
     favorite_artists: Mapped[List[str]] = mapped_column(
-        JSON,
+        JSONB,
         nullable=False,
         default=list,
     )
     favorite_tracks: Mapped[List[dict]] = mapped_column(
-        JSON,
+        JSONB,
         nullable=False,
         default=list,
     )
@@ -82,10 +81,10 @@ class UserPreference(Base, UUIDMixin, TimestampMixin):
         nullable=False,
     )
 
-    # Sound Preferences (JSON)
+    # Sound Preferences (JSONB)
     # Format: {"bass": 0.5, "mids": 0.5, "treble": 0.5, "soundstage": 0.5, "detail": 0.5}
     sound_preferences: Mapped[dict] = mapped_column(
-        JSON,
+        JSONB,
         nullable=False,
         default=dict,
     )
@@ -97,21 +96,22 @@ class UserPreference(Base, UUIDMixin, TimestampMixin):
         default="casual",
     )
     secondary_use_cases: Mapped[List[str]] = mapped_column(
-        JSON,
+        JSONB,
         nullable=False,
         default=list,
     )
 
-    # Budget
-    budget_min: Mapped[Decimal] = mapped_column(
-        Numeric(10, 2),
+    # Budget (only compared and displayed; float avoids Decimal arithmetic
+    # and conversion on every read)
+    budget_min: Mapped[float] = mapped_column(
+        Float,
         nullable=False,
-        default=Decimal("100.00"),
+        default=100.0,
     )
-    budget_max: Mapped[Decimal] = mapped_column(
-        Numeric(10, 2),
+    budget_max: Mapped[float] = mapped_column(
+        Float,
         nullable=False,
-        default=Decimal("400.00"),
+        default=400.0,
     )
 
     # Headphone Preferences
@@ -139,6 +139,18 @@ class UserPreference(Base, UUIDMixin, TimestampMixin):
         nullable=False,
     )
 
+    # Indexes
+    __table_args__ = (
+        # genres @> '["rock"]' lookups; jsonb_path_ops is smaller and faster
+        # than the default opclass for containment-only queries
+        Index(
+            "ix_user_preferences_genres_gin",
+            "genres",
+            postgresql_using="gin",
+            postgresql_ops={"genres": "jsonb_path_ops"},
+        ),
+    )
+
     # Relationships
     # recommendation_sessions: Mapped[List["RecommendationSession"]] = relationship(
     #     "RecommendationSession",
@@ -147,27 +159,39 @@ class UserPreference(Base, UUIDMixin, TimestampMixin):
     # )
 
     def __repr__(self) -> str:
-        return f"<UserPreference {self.session_id} - {len(self.genres)} genres, ${self.budget_min}-${self.budget_max}>"
+        return f"<UserPreference {self.session_id} - {len(self.genres)} genres, ${self.budget_min:.2f}-${self.budget_max:.2f}>"
 
     def to_dict(self) -> dict:
         """Convert model to dictionary."""
-        return {
-            "id": str(self.id),
-            "session_id": self.session_id,
-            "genres": self.genres,
-            "favorite_artists": self.favorite_artists,
-            "favorite_tracks": self.favorite_tracks,
-            "hours_per_day": self.hours_per_day,
-            "primary_source": self.primary_source,
-            "listening_environment": self.listening_environment,
-            "sound_preferences": self.sound_preferences,
-            "primary_use_case": self.primary_use_case,
-            "secondary_use_cases": self.secondary_use_cases,
-            "budget_min": float(self.budget_min),
-            "budget_max": float(self.budget_max),
-            "preferred_type": self.preferred_type,
-            "open_back_acceptable": self.open_back_acceptable,
-            "wireless_required": self.wireless_required,
-            "anc_required": self.anc_required,
-            "additional_notes": self.additional_notes,
+        # Read loaded values straight from the instance dict; only unloaded
+        # (expired or deferred) attributes go through the descriptor
+        state = self.__dict__
+        data = {
+            key: state[key] if key in state else getattr(self, key)
+            for key in _DICT_FIELDS
         }
+        data["id"] = str(data["id"])
+        return data
+
+
+# Columns returned by UserPreference.to_dict, in output order
+_DICT_FIELDS = (
+    "id",
+    "session_id",
+    "genres",
+    "favorite_artists",
+    "favorite_tracks",
+    "hours_per_day",
+    "primary_source",
+    "listening_environment",
+    "sound_preferences",
+    "primary_use_case",
+    "secondary_use_cases",
+    "budget_min",
+    "budget_max",
+    "preferred_type",
+    "open_back_acceptable",
+    "wireless_required",
+    "anc_required",
+    "additional_notes",
+)
@@ -3,15 +3,18 @@ Recommendation models - Session and HeadphoneMatch.
 """
 import enum
 import uuid
-from decimal import Decimal
 from typing import List, Optional
 
-from sqlalchemy import ForeignKey, Index, Integer, Numeric, String, Text, Enum
-from sqlalchemy.dialects.postgresql import JSON, UUID
+from sqlalchemy import ForeignKey, Index, Integer, SmallInteger, String, Text, Enum
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from app.db.base import Base, TimestampMixin, UUIDMixin
 
+# Match scores (0.0 - 1.0) are stored as SMALLINT multiples of 1/SCORE_SCALE:
+# fixed-width columns that decode as plain ints instead of Decimal
+SCORE_SCALE = 10_000
+
 
 class SessionStatus(str, enum.Enum):
     """Recommendation session status."""
@@ -75,12 +78,19 @@ class RecommendationSession(Base, UUIDMixin, TimestampMixin):
     #     back_populates="recommendation_sessions"
     # )
 
-    # matches: Mapped[List["HeadphoneMatch"]] = relationship(
-    #     "HeadphoneMatch",
-    #     back_populates="session",
-    #     cascade="all, delete-orphan",
-    #     order_by="HeadphoneMatch.rank"
-    # )
+    # Rows are removed by the ON DELETE CASCADE foreign key, so deleting a
+    # session never has to load its matches (no lazy IO under asyncio).
+    # Relationships here are lazy="raise": queries must eager-load them
+    # (selectinload/joinedload), and a missed load fails loudly instead of
+    # issuing one query per row
+    matches: Mapped[List["HeadphoneMatch"]] = relationship(
+        "HeadphoneMatch",
+        back_populates="session",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        order_by="HeadphoneMatch.rank",
+        lazy="raise",
+    )
 
     # Indexes for querying
     __table_args__ = (
@@ -115,12 +125,11 @@ class HeadphoneMatch(Base, UUIDMixin, TimestampMixin):
 
     __tablename__ = "headphone_matches"
 
-    # Links
+    # Links (session_id is indexed by ix_matches_session_rank_cover)
     session_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         ForeignKey("recommendation_sessions.id", ondelete="CASCADE"),
         nullable=False,
-        index=True,
     )
     headphone_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -135,71 +144,76 @@ class HeadphoneMatch(Base, UUIDMixin, TimestampMixin):
         nullable=False,
     )
 
-    # Scores (0.0 - 1.0)
-    overall_score: Mapped[Decimal] = mapped_column(
-        Numeric(5, 4),
+    # Scores (0.0 - 1.0, scaled by SCORE_SCALE)
+    overall_score: Mapped[int] = mapped_column(
+        SmallInteger,
         nullable=False,
     )
-    genre_match_score: Mapped[Decimal] = mapped_column(
-        Numeric(5, 4),
+    genre_match_score: Mapped[int] = mapped_column(
+        SmallInteger,
         nullable=False,
     )
-    sound_profile_score: Mapped[Decimal] = mapped_column(
-        Numeric(5, 4),
+    sound_profile_score: Mapped[int] = mapped_column(
+        SmallInteger,
         nullable=False,
     )
-    use_case_score: Mapped[Decimal] = mapped_column(
-        Numeric(5, 4),
+    use_case_score: Mapped[int] = mapped_column(
+        SmallInteger,
         nullable=False,
     )
-    budget_score: Mapped[Decimal] = mapped_column(
-        Numeric(5, 4),
+    budget_score: Mapped[int] = mapped_column(
+        SmallInteger,
         nullable=False,
     )
-    feature_match_score: Mapped[Decimal] = mapped_column(
-        Numeric(5, 4),
+    feature_match_score: Mapped[int] = mapped_column(
+        SmallInteger,
         nullable=False,
     )
 
-    # LLM-Generated Content
+    # LLM-Generated Content (JSONB lists are read whole, never filtered on,
+    # so they carry no GIN index)
     explanation: Mapped[str] = mapped_column(
         Text,
         nullable=False,
     )
     personalized_pros: Mapped[List[str]] = mapped_column(
-        JSON,
+        JSONB,
         nullable=False,
         default=list,
     )
     personalized_cons: Mapped[List[str]] = mapped_column(
-        JSON,
+        JSONB,
         nullable=False,
         default=list,
     )
     match_highlights: Mapped[List[str]] = mapped_column(
-        JSON,
+        JSONB,
         nullable=False,
         default=list,
     )
 
     # Relationships
-    # session: Mapped["RecommendationSession"] = relationship(
-    #     "RecommendationSession",
-    #     back_populates="matches"
-    # )
-    # headphone: Mapped["Headphone"] = relationship(
-    #     "Headphone",
-    #     back_populates="matches"
-    # )
+    session: Mapped["RecommendationSession"] = relationship(
+        "RecommendationSession",
+        back_populates="matches",
+        lazy="raise",
+    )
+    headphone: Mapped["Headphone"] = relationship("Headphone", lazy="raise")
 
-    # Indexes for common queries
+    # Matches are always read per session in rank order; the covering
+    # columns let listings of headphone and score use an index-only scan.
+    # The session_id prefix also serves the ON DELETE CASCADE lookup
     __table_args__ = (
-        Index("ix_matches_session_rank", "session_id", "rank"),
-        Index("ix_matches_session_score", "session_id", "overall_score"),
+        Index(
+            "ix_matches_session_rank_cover",
+            "session_id",
+            "rank",
+            postgresql_include=["headphone_id", "overall_score"],
+        ),
     )
 
     def __repr__(self) -> str:
-        return f"<HeadphoneMatch Rank {self.rank} - Score {self.overall_score}>"
+        return f"<HeadphoneMatch Rank {self.rank} - Score {self.overall_score / SCORE_SCALE}>"
 
     def to_dict(self) -> dict:
         """Convert model to dictionary."""
@@ -209,12 +223,12 @@ class HeadphoneMatch(Base, UUIDMixin, TimestampMixin):
             "headphone_id": str(self.headphone_id),
             "rank": self.rank,
             "scores": {
-                "overall": float(self.overall_score),
-                "genre_match": float(self.genre_match_score),
-                "sound_profile": float(self.sound_profile_score),
-                "use_case": float(self.use_case_score),
-                "budget": float(self.budget_score),
-                "feature_match": float(self.feature_match_score),
+                "overall": self.overall_score / SCORE_SCALE,
+                "genre_match": self.genre_match_score / SCORE_SCALE,
+                "sound_profile": self.sound_profile_score / SCORE_SCALE,
+                "use_case": self.use_case_score / SCORE_SCALE,
+                "budget": self.budget_score / SCORE_SCALE,
+                "feature_match": self.feature_match_score / SCORE_SCALE,
             },
             "explanation": self.explanation,
             "personalized_pros": self.personalized_pros,
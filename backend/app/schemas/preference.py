@@ -1,7 +1,6 @@
 """
 User Preference Pydantic schemas for API requests and responses.
 """
-from decimal import Decimal
 from uuid import UUID
 
 from pydantic import BaseModel, Field, field_validator, ConfigDict
@@ -54,8 +53,8 @@ class UserPreferenceBase(BaseModel):
         max_length=3,
         description="Up to 3 secondary use cases"
     )
-    budget_min: Decimal = Field(Decimal("100.00"), ge=0)
-    budget_max: Decimal = Field(Decimal("400.00"), ge=0)
+    budget_min: float = Field(100.0, ge=0)
+    budget_max: float = Field(400.0, ge=0)
     preferred_type: str | None = Field(None, max_length=50)
     open_back_acceptable: bool = True
     wireless_required: bool = False
@@ -64,7 +63,7 @@ class UserPreferenceBase(BaseModel):
 
     @field_validator("budget_max")
     @classmethod
-    def validate_budget_range(cls, v: Decimal, info) -> Decimal:
+    def validate_budget_range(cls, v: float, info) -> float:
         """Ensure budget_max >= budget_min."""
         if hasattr(info, 'data') and 'budget_min' in info.data:
             budget_min = info.data['budget_min']
@@ -110,8 +109,8 @@ class UserPreferenceUpdate(BaseModel):
     sound_preferences: SoundPreferences | None = None
     primary_use_case: str | None = None
     secondary_use_cases: list[str] | None = None
-    budget_min: Decimal | None = None
-    budget_max: Decimal | None = None
+    budget_min: float | None = None
+    budget_max: float | None = None
     preferred_type: str | None = None
     open_back_acceptable: bool | None = None
     wireless_required: bool | None = None
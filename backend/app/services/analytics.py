@@ -0,0 +1,151 @@
+"""
+Analytics event writer.
+
+Events are queued in memory and written by a background task in
+multi-row INSERTs, so request handlers never wait on an analytics write
+and high event rates cost one statement per batch instead of one per
+event. Analytics is best-effort: events are dropped if the queue is full
+or a batch fails to insert.
+"""
+import asyncio
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional
+
+import structlog
+from sqlalchemy import insert
+
+from app.db.session import AsyncSessionLocal
+from app.models import AnalyticsEvent
+
+logger = structlog.get_logger()
+
+
+class AnalyticsBatcher:
+    """Batches analytics events into bulk inserts."""
+
+    def __init__(
+        self,
+        max_batch_size: int = 500,
+        max_queue_time: float = 0.2,
+        max_queue_size: int = 10_000,
+    ):
+        """
+        Args:
+            max_batch_size: Maximum events per INSERT
+            max_queue_time: Seconds the first event of a batch may wait
+            max_queue_size: Maximum buffered events before dropping
+        """
+        self.max_batch_size = max_batch_size
+        self.max_queue_time = max_queue_time
+        self.max_queue_size = max_queue_size
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        # Batch being collected, and the insert currently running
+        self._batch: list[dict] = []
+        self._inserting: Optional[asyncio.Future] = None
+
+    def start(self):
+        """Create the queue and start the writer on the running loop."""
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the writer and insert any buffered events."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+        # An insert interrupted by the cancel keeps running; let it finish
+        if self._inserting is not None:
+            await self._inserting
+
+        batch, self._batch = self._batch, []
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        if batch:
+            await self._insert(batch)
+
+        if self.dropped:
+            logger.warning("analytics_events_dropped", count=self.dropped)
+
+        self._queue = None
+        self._task = None
+
+    def track(
+        self,
+        event_type: str,
+        session_id: uuid.UUID | None = None,
+        metadata: Dict[str, Any] | None = None,
+    ) -> bool:
+        """
+        Queue an analytics event.
+
+        Args:
+            event_type: Type of event
+            session_id: Optional session reference
+            metadata: Event metadata
+
+        Returns:
+            True if queued, False if the writer is not running (e.g. in a
+            Celery worker) and the caller should persist the event itself
+        """
+        if self._queue is None:
+            return False
+
+        row = {
+            "event_type": event_type,
+            "session_id": session_id,
+            "event_metadata": metadata or {},
+            "created_at": datetime.now(timezone.utc),
+        }
+
+        try:
+            self._queue.put_nowait(row)
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+        return True
+
+    async def _run(self):
+        """Collect events into batches and insert them until cancelled."""
+        while True:
+            self._batch.append(await self._queue.get())
+
+            # Collect more events until the batch is full or the first one
+            # has waited max_queue_time (asyncio.timeout, unlike wait_for,
+            # never swallows a cancel from stop())
+            try:
+                async with asyncio.timeout(self.max_queue_time):
+                    while len(self._batch) < self.max_batch_size:
+                        self._batch.append(await self._queue.get())
+            except TimeoutError:
+                pass
+
+            batch, self._batch = self._batch, []
+            # Shielded so stop() cannot abort a batch halfway
+            self._inserting = asyncio.ensure_future(self._insert(batch))
+            await asyncio.shield(self._inserting)
+            self._inserting = None
+
+    async def _insert(self, batch: list[dict]):
+        """Insert a batch of events in one statement."""
+        try:
+            async with AsyncSessionLocal() as db:
+                await db.execute(insert(AnalyticsEvent), batch)
+                await db.commit()
+
+            logger.debug("analytics_batch_inserted", count=len(batch))
+
+        except Exception as e:
+            logger.warning("analytics_batch_error", count=len(batch), error=str(e))
+
+
+# Global analytics writer
+analytics = AnalyticsBatcher()
@@ -3,20 +3,42 @@ LLM Client - Unified interface for Claude (Anthropic) and OpenAI.
 Handles API calls, retries, error handling, and token tracking.
 """
 import asyncio
-import json
-from typing import Any, Dict, List
+import re
+from typing import Any, AsyncIterator, Callable, Dict, List, TypeVar
 from decimal import Decimal
 
 import httpx
+import orjson
 import structlog
-from anthropic import AsyncAnthropic
+import xxhash
+from anthropic import AsyncAnthropic, DefaultAsyncHttpxClient
 from openai import AsyncOpenAI
 
 from app.config import settings
+from app.core.cache import cache
 from app.core.exceptions import LLMException
 
 logger = structlog.get_logger()
 
+T = TypeVar("T")
+
+# Connections to the Anthropic API: idle connections are kept for 30s (the
+# SDK default is 5s), so bursts of calls reuse TLS sessions
+ANTHROPIC_CONNECTION_LIMITS = httpx.Limits(
+    max_connections=100,
+    max_keepalive_connections=20,
+    keepalive_expiry=30.0,
+)
+
+# Prompt input caps: input tokens (and time to first token) grow with every
+# list item and description character, while the first few carry the signal
+PROMPT_LIST_LIMIT = 5
+PROMPT_DESCRIPTION_CHARS = 300
+
+# Outermost JSON object in a response, ignoring any markdown fence or prose
+# around it (first "{" through last "}")
+_JSON_OBJECT_RE = re.compile(r"\{.*\}", re.DOTALL)
+
 
 class LLMClient:
     """
@@ -34,22 +56,40 @@ class LLMClient:
         """Initialize LLM clients based on configuration."""
         self.provider = settings.llm_provider
         self.model = settings.llm_model
+        # Short, formulaic outputs (explanations) go to the faster model
+        self.fast_model = settings.llm_fast_model or settings.llm_model
         self.max_tokens = settings.llm_max_tokens
         self.temperature = settings.llm_temperature
         self.timeout = settings.llm_timeout
 
-        # Initialize appropriate client
+        # Initialize appropriate client. Retries happen in _attempts under
+        # one overall deadline, so the SDKs' own retries are turned off
+        # rather than multiplying attempts
         if self.provider == "anthropic":
-            api_key = settings.get_llm_api_key()
-            self.anthropic_client = AsyncAnthropic(api_key=api_key)
+            api_key = settings.llm_api_key
+            # One process-wide client; HTTP/2 multiplexes concurrent calls
+            # over the pooled connections
+            self.anthropic_client = AsyncAnthropic(
+                api_key=api_key,
+                max_retries=0,
+                http_client=DefaultAsyncHttpxClient(
+                    http2=True,
+                    limits=ANTHROPIC_CONNECTION_LIMITS,
+                ),
+            )
             self.openai_client = None
         elif self.provider == "openai":
-            api_key = settings.get_llm_api_key()
-            self.openai_client = AsyncOpenAI(api_key=api_key)
+            api_key = settings.llm_api_key
+            self.openai_client = AsyncOpenAI(api_key=api_key, max_retries=0)
             self.anthropic_client = None
         else:
             raise ValueError(f"Unknown LLM provider: {self.provider}")
 
+    async def close(self):
+        """Close the provider client's HTTP connections."""
+        client = self.anthropic_client or self.openai_client
+        await client.close()
+
     async def generate_recommendations(
         self,
         user_profile: Dict[str, Any],
@@ -67,22 +107,21 @@ class LLMClient:
         Returns:
             Dictionary with recommendations, scores, and explanations
         """
-        # Build prompt
-        prompt = self._build_recommendation_prompt(
-            user_profile, candidate_headphones, top_n
-        )
+        # Build prompt (candidate catalog is a separate, cacheable prefix)
+        context = self._build_candidates_context(candidate_headphones)
+        prompt = self._build_recommendation_prompt(user_profile, top_n)
 
         # Call LLM with retry
         try:
-            response = await self._call_llm_with_retry(
+            # Parsed and validated before the response is cached
+            result = await self._call_llm_with_retry(
                 prompt=prompt,
                 system_prompt=self._get_system_prompt(),
+                parse=self._parse_recommendation_response,
                 json_mode=True,
+                context=context,
             )
 
-            # Parse and validate response
-            result = self._parse_recommendation_response(response)
-
             logger.info(
                 "llm_recommendation_success",
                 provider=self.provider,
@@ -118,20 +157,25 @@ class LLMClient:
         Returns:
             Dictionary with detailed explanation and comparison points
         """
-        prompt = self._build_explanation_prompt(user_profile, headphone, other_headphones)
+        # The profile block is shared by every explanation in a session, so
+        # it goes ahead of the per-headphone task as a cacheable prefix
+        profile = self._build_explanation_profile(user_profile)
+        prompt = self._build_explanation_prompt(headphone, other_headphones)
 
         try:
-            response = await self._call_llm_with_retry(
+            result = await self._call_llm_with_retry(
                 prompt=prompt,
                 system_prompt=self._get_system_prompt(),
+                parse=lambda response: orjson.loads(_extract_json(response)),
                 json_mode=True,
+                context=profile,
+                model=self.fast_model,
             )
 
-            result = json.loads(response)
-
             logger.info(
                 "llm_explanation_success",
                 provider=self.provider,
+                model=self.fast_model,
                 headphone=headphone.get("full_name"),
             )
 
@@ -149,30 +193,126 @@ class LLMClient:
         self,
         prompt: str,
         system_prompt: str,
+        parse: Callable[[str], T],
         json_mode: bool = False,
         max_retries: int = 3,
+        context: str | None = None,
+        model: str | None = None,
+    ) -> T:
+        """
+        Call LLM API with exponential backoff retry and parse the response.
+
+        Identical requests are answered from the Redis response cache, and
+        identical requests already in flight share one provider call (and
+        its parsed result). A response is cached only once ``parse`` has
+        accepted it, so a malformed completion is never replayed.
+
+        Args:
+            prompt: User prompt
+            system_prompt: System instructions
+            parse: Converts the response text; raises if it is unusable
+            json_mode: Whether to request JSON output
+            max_retries: Maximum retry attempts
+            context: Static context sent ahead of the prompt (prompt-cached)
+            model: Model to call (defaults to self.model)
+
+        Returns:
+            Parsed LLM response
+        """
+        model = model or self.model
+        cache_key = self._response_cache_key(prompt, system_prompt, json_mode, context, model)
+        cached = await cache.get(cache_key)
+        if cached is not None:
+            logger.info("llm_response_cache_hit", provider=self.provider, model=model)
+            return parse(cached)
+
+        return await cache.single_flight(
+            cache_key,
+            lambda: self._load_response(
+                prompt, system_prompt, parse, json_mode, max_retries, context, model, cache_key
+            ),
+        )
+
+    async def _load_response(
+        self,
+        prompt: str,
+        system_prompt: str,
+        parse: Callable[[str], T],
+        json_mode: bool,
+        max_retries: int,
+        context: str | None,
+        model: str,
+        cache_key: str,
+    ) -> T:
+        """Call the provider, parse the response, then cache the text."""
+        content = await self._request_with_retry(
+            prompt, system_prompt, json_mode, max_retries, context, model
+        )
+        result = parse(content)
+        await cache.set(cache_key, content, ttl=settings.llm_cache_ttl_seconds)
+        return result
+
+    async def _request_with_retry(
+        self,
+        prompt: str,
+        system_prompt: str,
+        json_mode: bool,
+        max_retries: int,
+        context: str | None,
+        model: str,
     ) -> str:
         """
-        Call LLM API with exponential backoff retry.
+        Call the provider with exponential backoff.
+
+        Retries share one overall deadline (settings.llm_total_timeout), so a
+        slow provider cannot hold the request for every attempt's full
+        timeout plus backoff.
 
         Args:
             prompt: User prompt
             system_prompt: System instructions
             json_mode: Whether to request JSON output
             max_retries: Maximum retry attempts
+            context: Static context sent ahead of the prompt (prompt-cached)
+            model: Model to call
 
         Returns:
             LLM response text
         """
+        try:
+            async with asyncio.timeout(settings.llm_total_timeout):
+                return await self._attempts(
+                    prompt, system_prompt, json_mode, max_retries, context, model
+                )
+        except TimeoutError:
+            logger.warning("llm_deadline_exceeded", timeout=settings.llm_total_timeout)
+            raise LLMException("LLM request timed out")
+
+    async def _attempts(
+        self,
+        prompt: str,
+        system_prompt: str,
+        json_mode: bool,
+        max_retries: int,
+        context: str | None,
+        model: str,
+    ) -> str:
+        """Run up to max_retries provider calls with exponential backoff."""
         for attempt in range(max_retries):
             try:
                 if self.provider == "anthropic":
-                    return await self._call_anthropic(prompt, system_prompt, json_mode)
+                    content = await self._call_anthropic(
+                        prompt, system_prompt, json_mode, context, model
+                    )
                 elif self.provider == "openai":
-                    return await self._call_openai(prompt, system_prompt, json_mode)
+                    content = await self._call_openai(
+                        prompt, system_prompt, json_mode, context, model
+                    )
                 else:
                     raise ValueError(f"Unknown provider: {self.provider}")
 
+                return content
+
             except httpx.TimeoutException:
                 if attempt < max_retries - 1:
                     wait_time = 2 ** attempt  # Exponential backoff
@@ -200,48 +340,115 @@ class LLMClient:
 
         raise LLMException("Max retries exceeded")
 
+    def _response_cache_key(
+        self,
+        prompt: str,
+        system_prompt: str,
+        json_mode: bool,
+        context: str | None,
+        model: str,
+    ) -> str:
+        """
+        Build the response cache key for a request and model configuration.
+
+        Uses the 128-bit xxh3 digest: non-cryptographic like the other cache
+        keys, but wide enough that prompts never collide in practice.
+        """
+        payload = "|".join([
+            system_prompt,
+            context or "",
+            prompt,
+            self.provider,
+            model,
+            str(self.temperature),
+            str(self.max_tokens),
+            str(json_mode),
+        ])
+        return f"llm:{xxhash.xxh3_128_hexdigest(payload.encode())}"
+
     async def _call_anthropic(
-        self, prompt: str, system_prompt: str, json_mode: bool
+        self,
+        prompt: str,
+        system_prompt: str,
+        json_mode: bool,
+        context: str | None = None,
+        model: str | None = None,
     ) -> str:
-        """Call Anthropic Claude API."""
-        messages = [{"role": "user", "content": prompt}]
+        """
+        Call Anthropic Claude API.
+
+        The system prompt and the static context are marked as ephemeral
+        cache breakpoints so repeat requests reuse the cached prefix; the
+        per-user prompt is sent last, uncached.
+        """
+        model = model or self.model
 
         if json_mode:
             system_prompt += "\n\nYou must respond with valid JSON only. No markdown, no explanations outside the JSON structure."
 
-        response = await self.anthropic_client.messages.create(
-            model=self.model,
+        system = [
+            {"type": "text", "text": system_prompt, "cache_control": {"type": "ephemeral"}},
+        ]
+
+        content = []
+        if context:
+            content.append(
+                {"type": "text", "text": context, "cache_control": {"type": "ephemeral"}}
+            )
+        content.append({"type": "text", "text": prompt})
+
+        messages = [{"role": "user", "content": content}]
+
+        # Streamed so a JSON response can be returned as soon as its closing
+        # brace arrives, without waiting for anything the model adds after it
+        async with self.anthropic_client.messages.stream(
+            model=model,
             max_tokens=self.max_tokens,
             temperature=self.temperature,
-            system=system_prompt,
+            system=system,
             messages=messages,
             timeout=self.timeout,
-        )
-
-        # Extract text from response
-        content = response.content[0].text
+        ) as stream:
+            if json_mode:
+                content = await _read_json_object(stream.text_stream)
+            else:
+                content = await stream.get_final_text()
+            # Output tokens are as of the last delta if the stream was cut short
+            usage = stream.current_message_snapshot.usage
 
         # Log token usage
         logger.info(
             "anthropic_api_call",
-            model=self.model,
-            input_tokens=response.usage.input_tokens,
-            output_tokens=response.usage.output_tokens,
+            model=model,
+            input_tokens=usage.input_tokens,
+            output_tokens=usage.output_tokens,
+            cache_creation_input_tokens=usage.cache_creation_input_tokens,
+            cache_read_input_tokens=usage.cache_read_input_tokens,
         )
 
         return content
 
     async def _call_openai(
-        self, prompt: str, system_prompt: str, json_mode: bool
+        self,
+        prompt: str,
+        system_prompt: str,
+        json_mode: bool,
+        context: str | None = None,
+        model: str | None = None,
     ) -> str:
         """Call OpenAI API."""
+        model = model or self.model
+
+        # Static context goes first so OpenAI's automatic prefix caching applies
+        user_content = f"{context}\n\n{prompt}" if context else prompt
+
         messages = [
             {"role": "system", "content": system_prompt},
-            {"role": "user", "content": prompt},
+            {"role": "user", "content": user_content},
         ]
 
         kwargs = {
-            "model": self.model,
+            "model": model,
             "messages": messages,
             "temperature": self.temperature,
             "max_tokens": self.max_tokens,
@@ -249,7 +456,7 @@ class LLMClient:
         }
 
         # Enable JSON mode if supported
-        if json_mode and "gpt-4" in self.model.lower():
+        if json_mode and "gpt-4" in model.lower():
             kwargs["response_format"] = {"type": "json_object"}
 
         response = await self.openai_client.chat.completions.create(**kwargs)
@@ -259,7 +466,7 @@ class LLMClient:
         # Log token usage
         logger.info(
             "openai_api_call",
-            model=self.model,
+            model=model,
             input_tokens=response.usage.prompt_tokens,
             output_tokens=response.usage.completion_tokens,
         )
@@ -277,33 +484,37 @@ class LLMClient:
 
 Your task is to provide personalized, accurate headphone recommendations based on the user's music taste, listening habits, and requirements. Be specific, honest, and helpful."""
 
+    def _build_candidates_context(self, candidates: List[Dict[str, Any]]) -> str:
+        """Build the candidate headphone block shared by recommendation prompts."""
+        # One f-string per candidate, joined once (no quadratic += rebuilds)
+        candidates_text = "".join(
+            f"\n{i}. {hp['full_name']}\n"
+            f"   - Price: ${hp['price_usd']}\n"
+            f"   - Type: {hp['headphone_type']}, {hp['back_type']} back\n"
+            f"   - Wireless: {hp['is_wireless']}, ANC: {hp['has_anc']}\n"
+            f"   - Sound Signature: {hp['sound_signature']}\n"
+            f"   - Description: {_truncate(hp['description'])}\n"
+            f"   - Key Features: {', '.join(hp.get('key_features', [])[:PROMPT_LIST_LIMIT])}\n"
+            f"   - Target Genres: {', '.join(hp.get('target_genres', [])[:PROMPT_LIST_LIMIT])}\n"
+            for i, hp in enumerate(candidates, 1)
+        )
+
+        return f"**Candidate Headphones:**\n{candidates_text}"
+
     def _build_recommendation_prompt(
         self,
         user_profile: Dict[str, Any],
-        candidates: List[Dict[str, Any]],
         top_n: int,
     ) -> str:
         """Build prompt for recommendation generation."""
         # Extract user preferences
-        genres = ", ".join(user_profile.get("genres", []))
-        artists = ", ".join(user_profile.get("favorite_artists", [])[:5])
+        genres = ", ".join(user_profile.get("genres", [])[:PROMPT_LIST_LIMIT])
+        artists = ", ".join(user_profile.get("favorite_artists", [])[:PROMPT_LIST_LIMIT])
         sound_prefs = user_profile.get("sound_preferences", {})
         use_case = user_profile.get("primary_use_case", "casual")
         budget_min = user_profile.get("budget_min", 0)
         budget_max = user_profile.get("budget_max", 500)
 
-        # Format candidates
-        candidates_text = ""
-        for i, hp in enumerate(candidates, 1):
-            candidates_text += f"\n{i}. {hp['full_name']}\n"
-            candidates_text += f"   - Price: ${hp['price_usd']}\n"
-            candidates_text += f"   - Type: {hp['headphone_type']}, {hp['back_type']} back\n"
-            candidates_text += f"   - Wireless: {hp['is_wireless']}, ANC: {hp['has_anc']}\n"
-            candidates_text += f"   - Sound Signature: {hp['sound_signature']}\n"
-            candidates_text += f"   - Description: {hp['description']}\n"
-            candidates_text += f"   - Key Features: {', '.join(hp.get('key_features', []))}\n"
-            candidates_text += f"   - Target Genres: {', '.join(hp.get('target_genres', []))}\n"
-
         prompt = f"""**User Profile:**
 - **Favorite Genres**: {genres}
 - **Favorite Artists**: {artists if artists else "Not specified"}
@@ -316,9 +527,6 @@ Your task is to provide personalized, accurate headphone recommendations based o
 - **Primary Use Case**: {use_case}
 - **Budget**: ${budget_min} - ${budget_max}
 
-**Candidate Headphones:**
-{candidates_text}
-
 **Task:**
 Analyze the user's profile and rank the top {top_n} headphones from the candidates above. For each recommended headphone, provide:
 
@@ -361,22 +569,25 @@ Ensure scores are realistic and relative to the user's needs. Sort by overall sc
 
         return prompt
 
+    def _build_explanation_profile(self, user_profile: Dict[str, Any]) -> str:
+        """Build the user profile block shared by explanation prompts."""
+        sound_prefs = user_profile.get("sound_preferences", {})
+
+        return f"""**User Profile:**
+- Genres: {', '.join(user_profile.get('genres', [])[:PROMPT_LIST_LIMIT])}
+- Sound Preferences: Bass={sound_prefs.get('bass', 0.5):.1f}, Mids={sound_prefs.get('mids', 0.5):.1f}, Treble={sound_prefs.get('treble', 0.5):.1f}
+- Use Case: {user_profile.get('primary_use_case', 'casual')}
+- Budget: ${user_profile.get('budget_min', 0)}-${user_profile.get('budget_max', 500)}"""
+
     def _build_explanation_prompt(
         self,
-        user_profile: Dict[str, Any],
         headphone: Dict[str, Any],
         others: List[Dict[str, Any]],
     ) -> str:
-        """Build prompt for detailed explanation."""
-        prompt = f"""**User Profile:**
-- Genres: {', '.join(user_profile.get('genres', []))}
-- Sound Preferences: Bass={user_profile.get('sound_preferences', {}).get('bass', 0.5):.1f}, Mids={user_profile.get('sound_preferences', {}).get('mids', 0.5):.1f}, Treble={user_profile.get('sound_preferences', {}).get('treble', 0.5):.1f}
-- Use Case: {user_profile.get('primary_use_case', 'casual')}
-- Budget: ${user_profile.get('budget_min', 0)}-${user_profile.get('budget_max', 500)}
-
-**Recommended Headphone:**
+        """Build the per-headphone task for a detailed explanation."""
+        prompt = f"""**Recommended Headphone:**
 {headphone['full_name']} - ${headphone['price_usd']}
-{headphone['description']}
+{_truncate(headphone['description'])}
 
 **Other Recommendations:**
 {', '.join([h['full_name'] for h in others[:3]])}
@@ -401,18 +612,8 @@ Return as JSON:
     def _parse_recommendation_response(self, response: str) -> Dict[str, Any]:
         """Parse and validate LLM recommendation response."""
         try:
-            # Remove markdown code blocks if present
-            response = response.strip()
-            if response.startswith("```json"):
-                response = response[7:]
-            if response.startswith("```"):
-                response = response[3:]
-            if response.endswith("```"):
-                response = response[:-3]
-            response = response.strip()
-
-            # Parse JSON
-            data = json.loads(response)
+            # Parse JSON, without any markdown code block around it
+            data = orjson.loads(_extract_json(response))
 
             # Validate structure
             if "recommendations" not in data:
@@ -420,10 +621,63 @@ Return as JSON:
 
             return data
 
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             logger.error("llm_response_parse_error", error=str(e), response=response[:500])
             raise LLMException(f"Failed to parse LLM response as JSON: {str(e)}")
 
 
+def _truncate(text: str, limit: int = PROMPT_DESCRIPTION_CHARS) -> str:
+    """Shorten text to at most limit characters, marking the cut with an ellipsis."""
+    if len(text) <= limit:
+        return text
+    return text[:limit - 1].rstrip() + "…"
+
+
+def _extract_json(response: str) -> str:
+    """Return the JSON object in an LLM response, or the response unchanged."""
+    match = _JSON_OBJECT_RE.search(response)
+    return match.group() if match else response
+
+
+async def _read_json_object(chunks: AsyncIterator[str]) -> str:
+    """
+    Read streamed text up to the end of its first top-level JSON object.
+
+    Braces inside JSON strings are ignored. If no object closes, the whole
+    stream is returned for the caller's parser to reject.
+
+    Args:
+        chunks: Streamed response text
+
+    Returns:
+        Text received, ending at the object's closing brace
+    """
+    parts = []
+    depth = 0
+    in_string = escaped = False
+
+    async for chunk in chunks:
+        for i, char in enumerate(chunk):
+            if in_string:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == '"':
+                    in_string = False
+            elif char == "{":
+                depth += 1
+            elif depth and char == '"':
+                in_string = True
+            elif depth and char == "}":
+                depth -= 1
+                if not depth:
+                    parts.append(chunk[:i + 1])
+                    return "".join(parts)
+        parts.append(chunk)
+
+    return "".join(parts)
+
+
 # Global LLM client instance
 llm_client = LLMClient()
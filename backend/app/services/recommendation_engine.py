@@ -3,41 +3,71 @@ Recommendation Engine - Core service for generating headphone recommendations.
 
 This service orchestrates the entire recommendation process:
 1. Filter candidate headphones based on hard constraints
-2. Call LLM to rank and score headphones
-3. Save results to database
-4. Return recommendations
+2. Shortlist the closest sound-profile matches locally
+3. Call LLM to rank and score headphones
+4. Save results to database
+5. Return recommendations
 """
 import time
 import uuid
-from decimal import Decimal
 from typing import List, Dict, Any
 
 import structlog
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.config import settings
-from app.core.exceptions import DatabaseException, LLMException, ValidationException
+from app.core.cache import cache
+from app.core.exceptions import (
+    DatabaseException,
+    LLMException,
+    ResourceNotFoundException,
+    ValidationException,
+)
 from app.models import (
+    BackType,
     Headphone,
+    HeadphoneType,
     UserPreference,
     RecommendationSession,
     HeadphoneMatch,
     SessionStatus,
     AnalyticsEvent,
+    SCORE_SCALE,
 )
+from app.services.analytics import analytics
 from app.services.llm_client import llm_client
+from app.services.scoring import feature_vector, shortlist_candidates
 
 logger = structlog.get_logger()
 
+# Lower-cased type name -> HeadphoneType, for parsing preferred_type
+HEADPHONE_TYPES = {t.value: t for t in HeadphoneType}
+
+# LLM score key -> HeadphoneMatch column
+SCORE_COLUMNS = (
+    ("overall", "overall_score"),
+    ("genre_match", "genre_match_score"),
+    ("sound_profile", "sound_profile_score"),
+    ("use_case", "use_case_score"),
+    ("budget", "budget_score"),
+    ("feature_match", "feature_match_score"),
+)
+
 
 class RecommendationEngine:
     """
     Main recommendation engine.
 
     Coordinates headphone matching, LLM scoring, and result persistence.
+    One engine is built per request around that request's session, so it
+    carries no per-instance __dict__.
     """
 
+    __slots__ = ("db", "llm")
+
     def __init__(self, db: AsyncSession):
         """
         Initialize recommendation engine.
@@ -59,10 +89,11 @@ class RecommendationEngine:
         Process:
         1. Create recommendation session
         2. Fetch candidate headphones (hard constraints)
-        3. Call LLM for scoring and ranking
-        4. Save matches to database
-        5. Update session status
-        6. Track analytics
+        3. Shortlist candidates by sound-profile distance
+        4. Call LLM for scoring and ranking
+        5. Save matches to database
+        6. Update session status
+        7. Track analytics
 
         Args:
             preference: User preference object
@@ -76,6 +107,8 @@ class RecommendationEngine:
             DatabaseException: If database operations fail
         """
         start_time = time.time()
+        session = None
+        log = logger.bind(preference_id=str(preference.id))
 
         try:
             # Create session record
@@ -88,11 +121,8 @@ class RecommendationEngine:
             self.db.add(session)
             await self.db.flush()  # Get session ID
 
-            logger.info(
-                "recommendation_session_created",
-                session_id=str(session.id),
-                preference_id=str(preference.id),
-            )
+            log = log.bind(session_id=str(session.id))
+            log.info("recommendation_session_created")
 
             # Step 1: Fetch candidate headphones
             candidates = await self._fetch_candidate_headphones(preference)
@@ -100,33 +130,57 @@ class RecommendationEngine:
             if not candidates:
                 raise ValidationException(
                     "No headphones match your requirements",
-                    detail={"budget": f"${preference.budget_min}-${preference.budget_max}"},
+                    detail={"budget": f"${preference.budget_min:.2f}-${preference.budget_max:.2f}"},
                 )
 
-            logger.info(
-                "candidates_fetched",
-                session_id=str(session.id),
-                candidate_count=len(candidates),
+            log.info("candidates_fetched", candidate_count=len(candidates))
+
+            # Step 2: Keep only the closest sound-profile matches for the LLM;
+            # prompt size grows with every candidate sent
+            shortlist = shortlist_candidates(
+                candidates,
+                feature_vector(preference.sound_preferences),
+                top_k=max(settings.llm_max_candidates, top_n),
             )
+            if len(shortlist) < len(candidates):
+                log.info("candidates_shortlisted", shortlist_count=len(shortlist))
 
-            # Step 2: Prepare user profile for LLM
+            # Candidates were fetched with the scoring columns only; load
+            # the rest for the headphones that are sent on and returned
+            await self._load_headphone_details(shortlist)
+
+            # Step 3: Prepare user profile for LLM
             user_profile = self._build_user_profile(preference)
 
-            # Step 3: Call LLM for recommendations
-            llm_response = await self.llm.generate_recommendations(
-                user_profile=user_profile,
-                candidate_headphones=[h.to_dict() for h in candidates],
-                top_n=min(top_n, len(candidates)),
-            )
+            # Step 4: Call LLM for recommendations. Identical preferences
+            # within the TTL reuse the earlier ranking; it is still saved as
+            # this session's own matches
+            top_n = min(top_n, len(shortlist))
+            ranking_key = {
+                **user_profile,
+                "open_back_acceptable": preference.open_back_acceptable,
+                "top_n": top_n,
+            }
+            llm_response = await cache.get_cached_recommendation_result(ranking_key)
+            if llm_response is not None:
+                log.info("recommendation_ranking_cache_hit")
+            else:
+                llm_response = await self.llm.generate_recommendations(
+                    user_profile=user_profile,
+                    candidate_headphones=[h.to_dict() for h in shortlist],
+                    top_n=top_n,
+                )
+                if llm_response.get("recommendations"):
+                    await cache.cache_recommendation_result(ranking_key, llm_response)
 
-            # Step 4: Save matches to database
+            # Step 5: Save matches to database
             matches = await self._save_matches(
                 session=session,
                 llm_response=llm_response,
-                candidates={h.id: h for h in candidates},
+                candidates={h.id: h for h in shortlist},
             )
 
-            # Step 5: Update session status
+            # Step 6: Update session status
             processing_time_ms = int((time.time() - start_time) * 1000)
             session.status = SessionStatus.COMPLETE
             session.processing_time_ms = processing_time_ms
@@ -134,14 +188,16 @@ class RecommendationEngine:
             await self.db.commit()
             await self.db.refresh(session)
 
-            logger.info(
+            # Populate the collection from what we just saved (no lazy load)
+            set_committed_value(session, "matches", matches)
+
+            log.info(
                 "recommendation_session_complete",
-                session_id=str(session.id),
                 match_count=len(matches),
                 processing_time_ms=processing_time_ms,
             )
 
-            # Step 6: Track analytics
+            # Step 7: Track analytics
             await self._track_event(
                 event_type="recommendation_generated",
                 session_id=session.id,
@@ -156,6 +212,14 @@ class RecommendationEngine:
 
             return session
 
+        except ValidationException as e:
+            # Invalid preferences are the caller's error, not a server failure
+            if session:
+                session.status = SessionStatus.ERROR
+                session.error_message = e.message
+                await self.db.commit()
+            raise
+
         except LLMException:
             # Mark session as error
             if session:
@@ -165,11 +229,7 @@ class RecommendationEngine:
             raise
 
         except Exception as e:
-            logger.error(
-                "recommendation_generation_error",
-                error=str(e),
-                preference_id=str(preference.id),
-            )
+            log.error("recommendation_generation_error", error=str(e))
             if session:
                 session.status = SessionStatus.ERROR
                 session.error_message = str(e)
@@ -188,39 +248,20 @@ class RecommendationEngine:
         Returns:
             Session with matches, or None if not found
         """
-        query = select(RecommendationSession).where(
-            RecommendationSession.id == session_id
+        # Two round-trips regardless of match count: the session, then its
+        # matches with each headphone joined in
+        query = (
+            select(RecommendationSession)
+            .where(RecommendationSession.id == session_id)
+            .options(
+                selectinload(RecommendationSession.matches).joinedload(
+                    HeadphoneMatch.headphone
+                )
+            )
+            .execution_options(populate_existing=True)
         )
         result = await self.db.execute(query)
-        session = result.scalar_one_or_none()
-
-        if not session:
-            return None
-
-        # Fetch matches
-        matches_query = (
-            select(HeadphoneMatch)
-            .where(HeadphoneMatch.session_id == session_id)
-            .order_by(HeadphoneMatch.rank)
-        )
-        matches_result = await self.db.execute(matches_query)
-        matches = matches_result.scalars().all()
-
-        # Fetch headphones for matches
-        if matches:
-            headphone_ids = [m.headphone_id for m in matches]
-            headphones_query = select(Headphone).where(Headphone.id.in_(headphone_ids))
-            headphones_result = await self.db.execute(headphones_query)
-            headphones = {h.id: h for h in headphones_result.scalars().all()}
-
-            # Attach headphones to matches
-            for match in matches:
-                match.headphone = headphones.get(match.headphone_id)
-
-        # Attach matches to session
-        session.matches = matches
-
-        return session
+        return result.scalar_one_or_none()
 
     async def generate_detailed_explanation(
         self,
@@ -238,22 +279,29 @@ class RecommendationEngine:
             Dictionary with detailed explanation and comparison points
 
         Raises:
-            ValidationException: If session or headphone not found
+            ResourceNotFoundException: If session, preference or headphone match not found
         """
-        # Fetch session with preference
-        session = await self.get_session_with_matches(session_id)
-        if not session:
-            raise ValidationException("Session not found")
-
-        # Fetch preference
-        pref_query = select(UserPreference).where(
-            UserPreference.id == session.preference_id
+        # Fetch session and preference in one statement (the matches and
+        # their headphones follow in a second), instead of a third
+        # round-trip for the preference
+        query = (
+            select(RecommendationSession, UserPreference)
+            .outerjoin(UserPreference, UserPreference.id == RecommendationSession.preference_id)
+            .where(RecommendationSession.id == session_id)
+            .options(
+                selectinload(RecommendationSession.matches).joinedload(
+                    HeadphoneMatch.headphone
+                )
+            )
+            .execution_options(populate_existing=True)
         )
-        pref_result = await self.db.execute(pref_query)
-        preference = pref_result.scalar_one_or_none()
+        row = (await self.db.execute(query)).one_or_none()
+        if row is None:
+            raise ResourceNotFoundException("Session")
 
-        if not preference:
-            raise ValidationException("Preference not found")
+        session, preference = row
+        if preference is None:
+            raise ResourceNotFoundException("Preference")
 
         # Find target headphone in matches
         target_match = None
@@ -266,7 +314,7 @@ class RecommendationEngine:
                 other_headphones.append(match.headphone)
 
         if not target_match:
-            raise ValidationException("Headphone not in recommendations")
+            raise ResourceNotFoundException("Headphone match")
 
         # Build user profile
         user_profile = self._build_user_profile(preference)
@@ -299,15 +347,25 @@ class RecommendationEngine:
         - Preferred type (if specified)
         - Open back acceptable
 
+        Only the columns used for shortlisting are loaded; see
+        _load_headphone_details.
+
         Args:
             preference: User preferences
 
         Returns:
             List of candidate headphones
+
+        Raises:
+            ValidationException: If preferred_type is not a known type
         """
-        query = select(Headphone).where(
-            Headphone.price_usd >= preference.budget_min,
-            Headphone.price_usd <= preference.budget_max,
+        query = (
+            select(Headphone)
+            .options(load_only(Headphone.updated_at, Headphone.detailed_specs))
+            .where(
+                Headphone.price_usd >= preference.budget_min,
+                Headphone.price_usd <= preference.budget_max,
+            )
         )
 
         # Wireless requirement
@@ -320,12 +378,16 @@ class RecommendationEngine:
 
         # Preferred type
         if preference.preferred_type:
-            from app.models.headphone import HeadphoneType
-            query = query.where(Headphone.headphone_type == preference.preferred_type)
+            preferred_type = HEADPHONE_TYPES.get(preference.preferred_type.lower())
+            if preferred_type is None:
+                raise ValidationException(
+                    "Unknown headphone type",
+                    detail={"preferred_type": preference.preferred_type},
+                )
+            query = query.where(Headphone.headphone_type == preferred_type)
 
         # Open back filter
         if not preference.open_back_acceptable:
-            from app.models.headphone import BackType
             query = query.where(Headphone.back_type != BackType.OPEN)
 
         # Execute query
@@ -334,6 +396,24 @@ class RecommendationEngine:
 
         return list(candidates)
 
+    async def _load_headphone_details(self, headphones: List[Headphone]) -> None:
+        """
+        Load all columns of headphones fetched by _fetch_candidate_headphones.
+
+        One primary-key query for the shortlist, so descriptions, features
+        and other JSONB columns are never transferred for candidates that
+        are dropped.
+
+        Args:
+            headphones: Shortlisted headphones, refreshed in place
+        """
+        result = await self.db.execute(
+            select(Headphone)
+            .where(Headphone.id.in_([h.id for h in headphones]))
+            .execution_options(populate_existing=True)
+        )
+        result.scalars().all()
+
     def _build_user_profile(self, preference: UserPreference) -> Dict[str, Any]:
         """
         Convert UserPreference model to dictionary for LLM.
@@ -351,8 +431,8 @@ class RecommendationEngine:
             "sound_preferences": preference.sound_preferences,
             "primary_use_case": preference.primary_use_case,
             "secondary_use_cases": preference.secondary_use_cases,
-            "budget_min": float(preference.budget_min),
-            "budget_max": float(preference.budget_max),
+            "budget_min": preference.budget_min,
+            "budget_max": preference.budget_max,
             "wireless_required": preference.wireless_required,
             "anc_required": preference.anc_required,
             "preferred_type": preference.preferred_type,
@@ -388,26 +468,26 @@ class RecommendationEngine:
                 )
                 continue
 
-            # Create match record
+            # Create match record. Scores are clamped to [0, 1] before
+            # scaling: the columns are SMALLINT, so an off-scale answer
+            # (e.g. 0-100) would fail the insert
+            scores = rec["scores"]
             match = HeadphoneMatch(
                 session_id=session.id,
                 headphone_id=headphone_id,
                 rank=rec["rank"],
-                overall_score=Decimal(str(rec["scores"]["overall"])),
-                genre_match_score=Decimal(str(rec["scores"]["genre_match"])),
-                sound_profile_score=Decimal(str(rec["scores"]["sound_profile"])),
-                use_case_score=Decimal(str(rec["scores"]["use_case"])),
-                budget_score=Decimal(str(rec["scores"]["budget"])),
-                feature_match_score=Decimal(str(rec["scores"]["feature_match"])),
                 explanation=rec["explanation"],
                 personalized_pros=rec["personalized_pros"],
                 personalized_cons=rec["personalized_cons"],
                 match_highlights=rec["match_highlights"],
+                **{
+                    column: round(min(max(scores[key], 0.0), 1.0) * SCORE_SCALE)
+                    for key, column in SCORE_COLUMNS
+                },
             )
-
-            self.db.add(match)
             matches.append(match)
 
+        self.db.add_all(matches)
         await self.db.flush()
 
         logger.info(
@@ -432,10 +512,14 @@ class RecommendationEngine:
             session_id: Optional session reference
             metadata: Event metadata
         """
+        # Written in batches by the background writer when it is running;
+        # otherwise committed with the caller's transaction
+        if analytics.track(event_type, session_id, metadata):
+            return
+
         event = AnalyticsEvent(
             event_type=event_type,
             session_id=session_id,
-            metadata=metadata or {},
+            event_metadata=metadata or {},
         )
         self.db.add(event)
-        # Don't await commit - let it be committed with the main transaction
@@ -0,0 +1,144 @@
+"""
+Local sound-profile scoring for candidate headphones.
+
+Candidates that pass the hard constraints are ranked against the user's
+sound preferences with NumPy, so only the closest matches are sent to the
+LLM. Each headphone's `detailed_specs` becomes one row of an (N, D)
+float32 matrix and all rows are scored in a single vectorized pass.
+
+Rows are converted once per catalog revision and kept as packed float32
+bytes, so a request assembles its matrix with one join and no per-value
+Python-to-C conversion. Each packed row also carries its squared norm,
+which turns the per-request distance computation into a single
+matrix-vector product.
+"""
+import struct
+import uuid
+from datetime import datetime
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+from app.models import Headphone
+
+# Sound dimensions shared by Headphone.detailed_specs and
+# UserPreference.sound_preferences, in matrix column order
+SOUND_DIMENSIONS = ("bass", "mids", "treble", "soundstage", "detail")
+
+# Value assumed for a dimension a headphone or user does not specify
+NEUTRAL = 0.5
+
+# Packed row layout: the SOUND_DIMENSIONS values, then their squared norm
+ROW_WIDTH = len(SOUND_DIMENSIONS) + 1
+_ROW_STRUCT = struct.Struct(f"={ROW_WIDTH}f")
+
+# Feature rows derived from catalog specs, reused across requests the same
+# way Headphone.to_dict is: headphone ID -> (updated_at, packed float32 row)
+_row_cache: dict[uuid.UUID, tuple[datetime, bytes]] = {}
+
+
+def feature_vector(values: Dict[str, float]) -> np.ndarray:
+    """
+    Convert a sound-profile dict to a float32 vector.
+
+    Args:
+        values: Mapping of sound dimension to 0-1 value
+
+    Returns:
+        Vector of length len(SOUND_DIMENSIONS)
+    """
+    get = values.get
+    return np.array(
+        (
+            get("bass", NEUTRAL),
+            get("mids", NEUTRAL),
+            get("treble", NEUTRAL),
+            get("soundstage", NEUTRAL),
+            get("detail", NEUTRAL),
+        ),
+        dtype=np.float32,
+    )
+
+
+def _packed_rows(headphones: Sequence[Headphone]) -> np.ndarray:
+    """
+    Stack the packed rows of headphones into an (N, ROW_WIDTH) float32
+    matrix: feature values clamped to [0, 1], then their squared norm.
+
+    The matrix is a read-only view of the joined row bytes.
+    """
+    cache_get = _row_cache.get
+    rows = []
+    for headphone in headphones:
+        # Read loaded values straight from the instance dict, as
+        # UserPreference.to_dict does; instrumented attribute access costs
+        # more than the cache lookup itself
+        state = headphone.__dict__
+        if "id" in state and "updated_at" in state:
+            cached = cache_get(state["id"])
+            if cached is not None and cached[0] == state["updated_at"]:
+                rows.append(cached[1])
+                continue
+        rows.append(_feature_row(headphone))
+
+    return np.frombuffer(b"".join(rows), dtype=np.float32).reshape(
+        len(headphones), ROW_WIDTH
+    )
+
+
+def _feature_row(headphone: Headphone) -> bytes:
+    """Packed float32 row of a headphone, in ROW_WIDTH layout (memoized)."""
+    cached = _row_cache.get(headphone.id)
+    if cached is not None and cached[0] == headphone.updated_at:
+        return cached[1]
+
+    specs = headphone.detailed_specs or {}
+    # Catalog specs are hand-entered; clamp once, when the row is built.
+    # The layout is fixed, so the row is packed directly rather than going
+    # through a temporary array
+    bass, mids, treble, soundstage, detail = [
+        min(max(specs.get(dim, NEUTRAL), 0.0), 1.0) for dim in SOUND_DIMENSIONS
+    ]
+    row = _ROW_STRUCT.pack(
+        bass, mids, treble, soundstage, detail,
+        bass * bass + mids * mids + treble * treble
+        + soundstage * soundstage + detail * detail,
+    )
+    if headphone.id is not None:
+        _row_cache[headphone.id] = (headphone.updated_at, row)
+    return row
+
+
+def shortlist_candidates(
+    headphones: List[Headphone],
+    user_vec: np.ndarray,
+    top_k: int,
+) -> List[Headphone]:
+    """
+    Select the top_k headphones closest to the user's sound preferences.
+
+    Args:
+        headphones: Candidates that passed the hard constraints
+        user_vec: User's sound preferences, from feature_vector()
+        top_k: Number of headphones to keep
+
+    Returns:
+        Up to top_k headphones, closest first
+    """
+    if len(headphones) <= top_k:
+        return headphones
+
+    rows = _packed_rows(headphones)
+    features, sq_norms = rows[:, :-1], rows[:, -1]
+
+    # Squared Euclidean distance from the user's profile, one row per
+    # headphone, via ||c - u||^2 = ||c||^2 - 2 c.u + ||u||^2 (row norms are
+    # cached). Only the order matters here, so neither the constant ||u||^2
+    # nor a sqrt is applied
+    ranks = sq_norms - 2.0 * (features @ user_vec)
+
+    # Partial selection of the top_k, then sort only those
+    top = np.argpartition(ranks, top_k - 1)[:top_k]
+    top = top[np.argsort(ranks[top], kind="stable")]
+
+    return [headphones[i] for i in top]
@@ -6,8 +6,9 @@ Background tasks for async recommendation generation.
 import uuid
 
 from celery import Task
-from sqlalchemy import select
+from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.pool import NullPool
 import structlog
 
 from app.config import settings
@@ -17,8 +18,10 @@ from app.tasks.celery_app import celery_app
 
 logger = structlog.get_logger()
 
-# Create async engine for tasks
-engine = create_async_engine(settings.database_url, echo=False)
+# Create async engine for tasks.
+# Each task runs in its own event loop (asyncio.run), and asyncpg
+# connections cannot be reused across loops, so tasks do not pool.
+engine = create_async_engine(settings.database_url, echo=False, poolclass=NullPool)
 AsyncSessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -138,20 +141,17 @@ def cleanup_old_sessions_task():
         async with AsyncSessionLocal() as db:
             cutoff_date = datetime.now(timezone.utc) - timedelta(days=30)
 
-            # Delete old sessions
-            query = select(RecommendationSession).where(
-                RecommendationSession.created_at < cutoff_date
+            # Delete old sessions in one statement; their matches are removed
+            # by the ON DELETE CASCADE foreign key
+            result = await db.execute(
+                delete(RecommendationSession)
+                .where(RecommendationSession.created_at < cutoff_date)
+                .execution_options(synchronize_session=False)
             )
-            result = await db.execute(query)
-            old_sessions = result.scalars().all()
-
-            for session in old_sessions:
-                await db.delete(session)
-
             await db.commit()
 
-            logger.info("old_sessions_cleaned", count=len(old_sessions))
-            return len(old_sessions)
+            logger.info("old_sessions_cleaned", count=result.rowcount)
+            return result.rowcount
 
     return asyncio.run(cleanup())
 
@@ -0,0 +1,70 @@
+"""Store match scores as scaled integers
+
+Revision ID: aa7139809781
+Revises:
+Create Date: 2026-10-15 00:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'aa7139809781'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Fixed-point scale of the score columns (app.models.SCORE_SCALE at the
+# time of this revision; copied so later changes do not rewrite history)
+SCORE_SCALE = 10_000
+
+SCORE_COLUMNS = (
+    'overall_score',
+    'genre_match_score',
+    'sound_profile_score',
+    'use_case_score',
+    'budget_score',
+    'feature_match_score',
+)
+
+
+def _columns_of_type(type_: type) -> list[str]:
+    """Score columns currently of the given type (all of them offline)."""
+    if op.get_context().as_sql:
+        return list(SCORE_COLUMNS)
+
+    existing = {
+        column['name']: column['type']
+        for column in sa.inspect(op.get_bind()).get_columns('headphone_matches')
+    }
+    return [column for column in SCORE_COLUMNS if isinstance(existing[column], type_)]
+
+
+def upgrade() -> None:
+    # NUMERIC(5,4) allows up to 9.9999; clamp to the 0-1 score range so the
+    # scaled value always fits in SMALLINT. Columns already converted (e.g.
+    # a schema created from the current models) are left alone
+    for column in _columns_of_type(sa.Numeric):
+        op.alter_column(
+            'headphone_matches',
+            column,
+            existing_type=sa.Numeric(5, 4),
+            type_=sa.SmallInteger(),
+            existing_nullable=False,
+            postgresql_using=f'(LEAST(GREATEST({column}, 0), 1) * {SCORE_SCALE})::smallint',
+        )
+
+
+def downgrade() -> None:
+    for column in _columns_of_type(sa.SmallInteger):
+        op.alter_column(
+            'headphone_matches',
+            column,
+            existing_type=sa.SmallInteger(),
+            type_=sa.Numeric(5, 4),
+            existing_nullable=False,
+            postgresql_using=f'({column} / {SCORE_SCALE}.0)::numeric(5, 4)',
+        )
@@ -11,7 +11,6 @@ Requirements:
     - Run from project root directory
 """
 import asyncio
-import json
 import sys
 from pathlib import Path
 from decimal import Decimal
@@ -19,7 +18,8 @@ from decimal import Decimal
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from sqlalchemy import select
+import orjson
+from sqlalchemy import delete, func, insert, select
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 from app.config import settings
@@ -28,10 +28,9 @@ from app.models import Headphone, HeadphoneType, BackType, PriceTier
 
 async def load_headphones_data() -> list[dict]:
     """Load headphones from JSON file."""
-    json_path = Path(__file__).parent / "headphones.json"
+    json_path = settings.headphones_json
 
-    with open(json_path, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = orjson.loads(json_path.read_bytes())
 
     print(f"✅ Loaded {len(data)} headphones from {json_path.name}")
     return data
@@ -46,60 +45,60 @@ async def seed_headphones(session: AsyncSession, headphones_data: list[dict]):
         headphones_data: List of headphone dictionaries
     """
     # Check if headphones already exist
-    result = await session.execute(select(Headphone))
-    existing = result.scalars().all()
+    existing = await session.scalar(select(func.count()).select_from(Headphone))
 
     if existing:
-        print(f"⚠️  Database already contains {len(existing)} headphones")
+        print(f"⚠️  Database already contains {existing} headphones")
         response = input("Do you want to clear and re-seed? (y/N): ")
 
         if response.lower() == "y":
-            # Delete all existing headphones
-            for hp in existing:
-                await session.delete(hp)
+            # Delete all existing headphones in one statement
+            await session.execute(delete(Headphone))
             await session.commit()
-            print(f"🗑️  Deleted {len(existing)} existing headphones")
+            print(f"🗑️  Deleted {existing} existing headphones")
         else:
             print("❌ Seeding cancelled")
             return
 
-    # Create headphone objects
-    headphones = []
-    for data in headphones_data:
-        headphone = Headphone(
-            brand=data["brand"],
-            model=data["model"],
-            full_name=data["full_name"],
-            slug=data["slug"],
-            headphone_type=HeadphoneType(data["headphone_type"]),
-            back_type=BackType(data["back_type"]),
-            is_wireless=data["is_wireless"],
-            has_anc=data["has_anc"],
-            price_usd=Decimal(str(data["price_usd"])),
-            price_tier=PriceTier(data["price_tier"]),
-            image_url=data["image_url"],
-            sound_signature=data["sound_signature"],
-            description=data["description"],
-            key_features=data["key_features"],
-            pros=data["pros"],
-            cons=data["cons"],
-            detailed_specs=data["detailed_specs"],
-            target_genres=data["target_genres"],
-            target_use_cases=data["target_use_cases"],
-        )
-        headphones.append(headphone)
-        session.add(headphone)
+    # Build plain row dicts and insert them in a single executemany,
+    # instead of constructing and flushing an ORM object per headphone
+    rows = [
+        {
+            "brand": data["brand"],
+            "model": data["model"],
+            "full_name": data["full_name"],
+            "slug": data["slug"],
+            "headphone_type": HeadphoneType(data["headphone_type"]),
+            "back_type": BackType(data["back_type"]),
+            "is_wireless": data["is_wireless"],
+            "has_anc": data["has_anc"],
+            "price_usd": Decimal(str(data["price_usd"])),
+            "price_tier": PriceTier(data["price_tier"]),
+            "image_url": data["image_url"],
+            "sound_signature": data["sound_signature"],
+            "description": data["description"],
+            "key_features": data["key_features"],
+            "pros": data["pros"],
+            "cons": data["cons"],
+            "detailed_specs": data["detailed_specs"],
+            "target_genres": data["target_genres"],
+            "target_use_cases": data["target_use_cases"],
+        }
+        for data in headphones_data
+    ]
+
+    await session.execute(insert(Headphone), rows)
 
     # Commit all headphones
     await session.commit()
 
-    print(f"✅ Successfully seeded {len(headphones)} headphones!")
+    print(f"✅ Successfully seeded {len(rows)} headphones!")
     print("\n📊 Breakdown by price tier:")
 
     # Count by tier
     tier_counts = {}
-    for hp in headphones:
-        tier = hp.price_tier.value
+    for row in rows:
+        tier = row["price_tier"].value
         tier_counts[tier] = tier_counts.get(tier, 0) + 1
 
     for tier, count in sorted(tier_counts.items()):
@@ -108,15 +107,15 @@ async def seed_headphones(session: AsyncSession, headphones_data: list[dict]):
 
 async def verify_seed(session: AsyncSession):
     """Verify seeded data."""
-    result = await session.execute(select(Headphone))
-    headphones = result.scalars().all()
+    count = await session.scalar(select(func.count()).select_from(Headphone))
 
-    print(f"\n✅ Verification: {len(headphones)} headphones in database")
+    print(f"\n✅ Verification: {count} headphones in database")
 
     # Show some examples
-    if headphones:
+    if count:
+        result = await session.execute(select(Headphone).limit(5))
         print("\n🎧 Sample headphones:")
-        for hp in headphones[:5]:
+        for hp in result.scalars():
             print(f"   - {hp.full_name} (${hp.price_usd}) - {hp.price_tier.value}")
 
 